@@ -8,22 +8,20 @@ import subprocess
 import sys
 import os
 from pathlib import Path
+from typing import List
 
-def run_command(command, description):
-    """Run a command and handle errors"""
+def run_command(command: List[str], description):
+    """Run a command (argument list) and handle errors"""
     print(f"\n{'='*50}")
     print(f"🔧 {description}")
     print(f"{'='*50}")
     
     try:
-        result = subprocess.run(command, shell=True, check=True, 
-                              capture_output=True, text=True)
-        print(result.stdout)
+        # Run without a shell and stream output straight to the terminal
+        subprocess.run(command, check=True)
         return True
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, OSError) as e:
         print(f"❌ Error: {e}")
-        print(f"Output: {e.stdout}")
-        print(f"Error: {e.stderr}")
         return False
 
 def check_python_version():
@@ -58,7 +56,8 @@ def main():
     print(f"📁 Working directory: {project_dir}")
     
     # Install dependencies
-    if not run_command("pip install -r requirements.txt", "Installing Python dependencies"):
+    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+                       "Installing Python dependencies"):
         print("\n❌ Failed to install dependencies")
         print("💡 Try running: pip install --upgrade pip")
         print("💡 Or create a virtual environment first")
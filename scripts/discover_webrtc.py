@@ -18,6 +18,33 @@ from utils.logger import get_logger
 
 logger = get_logger("webrtc_discovery")
 
+# Common WebRTC discovery patterns
+DISCOVERY_MESSAGES = [
+    b"WEBRTC_DISCOVERY",
+    b"UNITREE_WEBRTC_DISCOVER",
+    json.dumps({"type": "discover"}).encode(),
+    json.dumps({"action": "discover", "protocol": "webrtc"}).encode()
+]
+
+DISCOVERY_PORTS = [8080, 8081, 8765, 9000, 9001, 5000, 5001]
+
+# WebRTC offer request sent to candidate WebSocket signaling endpoints
+OFFER_REQUEST_JSON = json.dumps({"type": "offer_request", "sdp_type": "offer"})
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Forwards received datagrams to a queue"""
+    
+    def __init__(self, responses: asyncio.Queue):
+        self.responses = responses
+        
+    def datagram_received(self, data, addr):
+        self.responses.put_nowait((data, addr))
+        
+    def error_received(self, exc):
+        logger.debug(f"Discovery socket error: {exc}")
+
+
 class UnitreeWebRTCDiscovery:
     def __init__(self, robot_ip: str = "192.168.100.94"):
         self.robot_ip = robot_ip
@@ -26,41 +53,34 @@ class UnitreeWebRTCDiscovery:
         """Test WebRTC multicast responder"""
         logger.info("🔍 Testing WebRTC multicast discovery...")
         
+        transport = None
         try:
-            # Try to send multicast discovery packet
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(5)
+            loop = asyncio.get_running_loop()
+            responses = asyncio.Queue()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DiscoveryProtocol(responses),
+                family=socket.AF_INET
+            )
             
-            # Common WebRTC discovery patterns
-            discovery_messages = [
-                b"WEBRTC_DISCOVERY",
-                b"UNITREE_WEBRTC_DISCOVER", 
-                json.dumps({"type": "discover"}).encode(),
-                json.dumps({"action": "discover", "protocol": "webrtc"}).encode()
-            ]
+            # Send every probe back-to-back, then wait once for any reply
+            for port in DISCOVERY_PORTS:
+                logger.info(f"📤 Sending discovery to {self.robot_ip}:{port}")
+                for msg in DISCOVERY_MESSAGES:
+                    transport.sendto(msg, (self.robot_ip, port))
             
-            # Try different ports
-            ports = [8080, 8081, 8765, 9000, 9001, 5000, 5001]
+            try:
+                data, addr = await asyncio.wait_for(responses.get(), timeout=2.0)
+            except asyncio.TimeoutError:
+                return None, None
             
-            for port in ports:
-                for msg in discovery_messages:
-                    try:
-                        logger.info(f"📤 Sending discovery to {self.robot_ip}:{port}")
-                        sock.sendto(msg, (self.robot_ip, port))
-                        
-                        # Try to receive response
-                        data, addr = sock.recvfrom(1024)
-                        logger.info(f"📥 Received response from {addr}: {data}")
-                        return port, data
-                        
-                    except socket.timeout:
-                        continue
-                    except Exception as e:
-                        logger.debug(f"Error on port {port}: {e}")
-                        continue
+            logger.info(f"📥 Received response from {addr}: {data}")
+            return addr[1], data
                         
         except Exception as e:
             logger.error(f"❌ Multicast discovery failed: {e}")
+        finally:
+            if transport is not None:
+                transport.close()
             
         return None, None
     
@@ -81,24 +101,34 @@ class UnitreeWebRTCDiscovery:
         ]
         
         ports = [8080, 8081, 8000, 8001, 9000, 9001]
+        urls = [f"http://{self.robot_ip}:{port}{endpoint}" for port in ports for endpoint in endpoints]
         
-        for port in ports:
-            for endpoint in endpoints:
-                url = f"http://{self.robot_ip}:{port}{endpoint}"
-                
-                try:
-                    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as session:
-                        # Try GET first
-                        async with session.get(url) as resp:
-                            if resp.status == 200:
-                                content = await resp.text()
-                                logger.info(f"✅ HTTP endpoint found: {url}")
-                                logger.info(f"📄 Response: {content[:200]}...")
-                                return url, content
-                                
-                except Exception as e:
-                    logger.debug(f"HTTP test failed for {url}: {e}")
-                    continue
+        async def _fetch(session, url):
+            try:
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        return url, await resp.text()
+            except Exception as e:
+                logger.debug(f"HTTP test failed for {url}: {e}")
+            return None, None
+        
+        # Share one session and race every URL; the first 200 wins
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=2),
+            connector=aiohttp.TCPConnector(limit=50)
+        ) as session:
+            tasks = [asyncio.create_task(_fetch(session, url)) for url in urls]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    url, content = await next_done
+                    if url:
+                        logger.info(f"✅ HTTP endpoint found: {url}")
+                        logger.info(f"📄 Response: {content[:200]}...")
+                        return url, content
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
                     
         return None, None
     
@@ -119,30 +149,36 @@ class UnitreeWebRTCDiscovery:
         ]
         
         ports = [8080, 8081, 8765, 9000, 9001]
+        ws_urls = [f"ws://{self.robot_ip}:{port}{endpoint}" for port in ports for endpoint in ws_endpoints]
         
-        for port in ports:
-            for endpoint in ws_endpoints:
-                ws_url = f"ws://{self.robot_ip}:{port}{endpoint}"
-                
-                try:
-                    logger.info(f"🔌 Trying WebSocket: {ws_url}")
-                    async with websockets.connect(ws_url, timeout=3) as websocket:
-                        # Try to send a WebRTC offer request
-                        offer_request = {
-                            "type": "offer_request",
-                            "sdp_type": "offer"
-                        }
-                        
-                        await websocket.send(json.dumps(offer_request))
-                        response = await asyncio.wait_for(websocket.recv(), timeout=2)
-                        
-                        logger.info(f"✅ WebSocket connection successful: {ws_url}")
-                        logger.info(f"📥 Response: {response}")
-                        return ws_url, response
-                        
-                except Exception as e:
-                    logger.debug(f"WebSocket test failed for {ws_url}: {e}")
-                    continue
+        async def _try(ws_url):
+            logger.info(f"🔌 Trying WebSocket: {ws_url}")
+            async with websockets.connect(ws_url, timeout=3) as websocket:
+                # Try to send a WebRTC offer request
+                await websocket.send(OFFER_REQUEST_JSON)
+                response = await asyncio.wait_for(websocket.recv(), timeout=2)
+                return ws_url, response
+        
+        # Attempt every endpoint at once and keep the first success
+        pending = {asyncio.create_task(_try(ws_url)): ws_url for ws_url in ws_urls}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    ws_url = pending.pop(task)
+                    try:
+                        ws_url, response = task.result()
+                    except Exception as e:
+                        logger.debug(f"WebSocket test failed for {ws_url}: {e}")
+                        continue
+                    
+                    logger.info(f"✅ WebSocket connection successful: {ws_url}")
+                    logger.info(f"📥 Response: {response}")
+                    return ws_url, response
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
                     
         return None, None
     
@@ -150,23 +186,29 @@ class UnitreeWebRTCDiscovery:
         """Scan for open ports on robot"""
         logger.info("🔍 Scanning for open ports...")
         
-        open_ports = []
         # Test common WebRTC/media ports
         test_ports = range(8000, 8100)
         
-        for port in test_ports:
+        loop = asyncio.get_running_loop()
+        
+        async def _probe(port):
+            # Bare non-blocking connect; the loop's selector waits on all
+            # sockets together and no stream objects are built per probe
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(0.5)
-            
+            sock.setblocking(False)
             try:
-                result = sock.connect_ex((self.robot_ip, port))
-                if result == 0:
-                    open_ports.append(port)
-                    logger.info(f"✅ Port {port} is open")
-            except:
-                pass
+                await asyncio.wait_for(loop.sock_connect(sock, (self.robot_ip, port)), timeout=0.5)
+            except (OSError, asyncio.TimeoutError):
+                return None
             finally:
                 sock.close()
+            
+            logger.info(f"✅ Port {port} is open")
+            return port
+        
+        # Probe all ports concurrently; total time is bounded by one timeout
+        results = await asyncio.gather(*(_probe(port) for port in test_ports))
+        open_ports = [port for port in results if port is not None]
                 
         return open_ports
 
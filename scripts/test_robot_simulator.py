@@ -6,13 +6,17 @@ This demonstrates how real robot data would flow into Butler Connect
 import rclpy
 from rclpy.node import Node
 import time
-import random
 import math
 
+import numpy as np
+
 from sensor_msgs.msg import BatteryState, Temperature
 from nav_msgs.msg import Odometry
 from geometry_msgs.msg import Point, Quaternion, Twist, Vector3
 
+# Number of noise samples drawn per refill
+_NOISE_BATCH = 4096
+
 
 class UnitreeSimulatorNode(Node):
     def __init__(self):
@@ -33,72 +37,112 @@ class UnitreeSimulatorNode(Node):
         self.position_y = 0.0
         self.yaw = 0.0
         
+        # Noise is drawn in bulk from NumPy and consumed a few values per tick
+        self._rng = np.random.default_rng()
+        self._refill_noise()
+        
+        # Reused message objects; only the varying fields change per tick
+        self._build_messages()
+        
         self.get_logger().info('🤖 Unitree Go2 Simulator Node Started')
         self.get_logger().info('📡 Publishing real-like sensor data to:')
         self.get_logger().info('   - /battery_state (BatteryState)')
         self.get_logger().info('   - /temperature (Temperature)')
         self.get_logger().info('   - /odom (Odometry)')
 
+    def _refill_noise(self):
+        """Draw a fresh batch of uniform noise in [-1, 1)"""
+        self._noise = self._rng.uniform(-1.0, 1.0, size=_NOISE_BATCH).tolist()
+        self._noise_idx = 0
+
+    def _build_messages(self):
+        """Pre-build the published messages with their constant fields filled in"""
+        # Battery data (realistic Unitree Go2 values)
+        self._battery_msg = BatteryState()
+        self._battery_msg.header.frame_id = "base_link"
+        self._battery_msg.charge = float('nan')  # Not measured
+        self._battery_msg.capacity = 15.0  # Ah (approximate Go2 capacity)
+        self._battery_msg.design_capacity = 15.0
+        self._battery_msg.power_supply_status = BatteryState.POWER_SUPPLY_STATUS_DISCHARGING
+        self._battery_msg.power_supply_health = BatteryState.POWER_SUPPLY_HEALTH_GOOD
+        self._battery_msg.power_supply_technology = BatteryState.POWER_SUPPLY_TECHNOLOGY_LIPO
+        
+        # Temperature data (internal temperature)
+        self._temp_msg = Temperature()
+        self._temp_msg.header.frame_id = "base_link"
+        self._temp_msg.variance = 1.0
+        
+        # Odometry data (position and orientation)
+        self._odom_msg = Odometry()
+        self._odom_msg.header.frame_id = "odom"
+        self._odom_msg.child_frame_id = "base_link"
+        self._odom_msg.pose.pose.position.z = 0.35  # Robot height
+        self._odom_msg.pose.pose.orientation.x = 0.0
+        self._odom_msg.pose.pose.orientation.y = 0.0
+        # Velocities (simple differential)
+        self._odom_msg.twist.twist.linear.x = 0.01  # 1 cm/s forward
+        self._odom_msg.twist.twist.angular.z = 0.005  # Rotation speed
+
     def publish_sensor_data(self):
-        current_time = self.get_clock().now()
+        # Local bindings keep the 10 Hz tick on fast local lookups
+        sin = math.sin
+        cos = math.cos
+        
+        if self._noise_idx + 2 > _NOISE_BATCH:
+            self._refill_noise()
+        noise = self._noise
+        idx = self._noise_idx
+        current_noise = noise[idx]
+        temp_noise = noise[idx + 1]
+        self._noise_idx = idx + 2
+        
+        # All three sensors publish at the same instant and share one stamp
+        stamp = self.get_clock().now().to_msg()
         elapsed = time.time() - self.start_time
         
-        # Publish battery data (realistic Unitree Go2 values)
-        battery_msg = BatteryState()
-        battery_msg.header.stamp = current_time.to_msg()
-        battery_msg.header.frame_id = "base_link"
+        # Publish battery data
+        battery_msg = self._battery_msg
+        battery_msg.header.stamp = stamp
         
         # Simulate battery drain over time
         self.battery_level = max(15.0, 85.0 - (elapsed / 3600.0) * 10.0)  # 10% per hour
         battery_msg.percentage = self.battery_level / 100.0
         battery_msg.voltage = 25.2 * (self.battery_level / 100.0)  # 6S LiPo nominal
-        battery_msg.current = random.uniform(2.0, 8.0)  # 2-8A consumption
-        battery_msg.charge = float('nan')  # Not measured
-        battery_msg.capacity = 15.0  # Ah (approximate Go2 capacity)
-        battery_msg.design_capacity = 15.0
-        battery_msg.power_supply_status = BatteryState.POWER_SUPPLY_STATUS_DISCHARGING
-        battery_msg.power_supply_health = BatteryState.POWER_SUPPLY_HEALTH_GOOD
-        battery_msg.power_supply_technology = BatteryState.POWER_SUPPLY_TECHNOLOGY_LIPO
+        battery_msg.current = 5.0 + 3.0 * current_noise  # 2-8A consumption
         
         self.battery_pub.publish(battery_msg)
         
-        # Publish temperature data (internal temperature)
-        temp_msg = Temperature()
-        temp_msg.header.stamp = current_time.to_msg()
-        temp_msg.header.frame_id = "base_link"
+        # Publish temperature data
+        temp_msg = self._temp_msg
+        temp_msg.header.stamp = stamp
         # Realistic robot internal temperature with some variation
-        base_temp = 45.0 + 10.0 * math.sin(elapsed * 0.01)  # Slow variation
-        temp_msg.temperature = base_temp + random.uniform(-2.0, 2.0)
-        temp_msg.variance = 1.0
+        base_temp = 45.0 + 10.0 * sin(elapsed * 0.01)  # Slow variation
+        temp_msg.temperature = base_temp + 2.0 * temp_noise
         
         self.temp_pub.publish(temp_msg)
         
-        # Publish odometry data (position and orientation)
-        odom_msg = Odometry()
-        odom_msg.header.stamp = current_time.to_msg()
-        odom_msg.header.frame_id = "odom"
-        odom_msg.child_frame_id = "base_link"
+        # Publish odometry data
+        odom_msg = self._odom_msg
+        odom_msg.header.stamp = stamp
         
         # Simulate robot walking in a small circle
         self.yaw += 0.005  # Slow rotation
         radius = 2.0
-        self.position_x = radius * math.cos(self.yaw)
-        self.position_y = radius * math.sin(self.yaw)
+        # Two trig calls on the half angle give both the quaternion and,
+        # via double-angle identities, the full-angle position
+        half_yaw = self.yaw * 0.5
+        sin_half = sin(half_yaw)
+        cos_half = cos(half_yaw)
+        self.position_x = radius * (cos_half * cos_half - sin_half * sin_half)
+        self.position_y = radius * (2.0 * sin_half * cos_half)
         
         # Position
         odom_msg.pose.pose.position.x = self.position_x
         odom_msg.pose.pose.position.y = self.position_y
-        odom_msg.pose.pose.position.z = 0.35  # Robot height
         
         # Orientation (quaternion from yaw)
-        odom_msg.pose.pose.orientation.x = 0.0
-        odom_msg.pose.pose.orientation.y = 0.0
-        odom_msg.pose.pose.orientation.z = math.sin(self.yaw / 2.0)
-        odom_msg.pose.pose.orientation.w = math.cos(self.yaw / 2.0)
-        
-        # Velocities (simple differential)
-        odom_msg.twist.twist.linear.x = 0.01  # 1 cm/s forward
-        odom_msg.twist.twist.angular.z = 0.005  # Rotation speed
+        odom_msg.pose.pose.orientation.z = sin_half
+        odom_msg.pose.pose.orientation.w = cos_half
         
         self.odom_pub.publish(odom_msg)
 
@@ -6,6 +6,7 @@ Tests WebRTC connectivity and data flow without full application
 """
 
 import asyncio
+import functools
 import sys
 import os
 import signal
@@ -22,6 +23,15 @@ from utils.logger import get_logger
 # Setup logging
 logger = get_logger("webrtc_test")
 
+CONFIG_PATH = str(Path(__file__).parent.parent / 'config' / 'robot_config.yaml')
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config(path: str):
+    """Parse a config file once per path; callers must not mutate the result"""
+    return ConfigLoader.load_config(path)
+
+
 class WebRTCTester:
     def __init__(self):
         self.client = None
@@ -127,8 +137,7 @@ async def main():
     
     # Load configuration
     try:
-        config_path = Path(__file__).parent.parent / 'config' / 'robot_config.yaml'
-        config = ConfigLoader.load_config(str(config_path))
+        config = _load_config(CONFIG_PATH)
         
         robot_config = config.get('robot', {})
         robot_ip = robot_config.get('ip_address', '192.168.100.94')
@@ -5,14 +5,21 @@ Motion Controller - High-level motion control for Unitree Go2
 import asyncio
 import logging
 import math
-from typing import Dict, Any, Tuple, Optional
+import sys
+from typing import Dict, Any, List, Tuple, Optional, Sequence, Union
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 from core.robot_manager import RobotManager, MotionCommand, RobotMode
 from utils.logger import get_logger
 
 
+# dataclass(slots=True) is only available on Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
 class GaitType(Enum):
     """Available gait types"""
     WALK = "walk"
@@ -21,7 +28,7 @@ class GaitType(Enum):
     BOUND = "bound"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TrajectoryPoint:
     """Single point in a trajectory"""
     x: float
@@ -31,7 +38,16 @@ class TrajectoryPoint:
     timestamp: float
 
 
-@dataclass
+# Planned trajectories are (N, 5) float32 arrays with these columns
+TRAJ_X, TRAJ_Y, TRAJ_Z, TRAJ_YAW, TRAJ_T = range(5)
+
+
+def trajectory_points(trajectory: np.ndarray) -> List[TrajectoryPoint]:
+    """Expand a trajectory array into TrajectoryPoint objects (for debugging/inspection)"""
+    return [TrajectoryPoint(*map(float, row)) for row in trajectory]
+
+
+@dataclass(**_SLOTS)
 class MotionProfile:
     """Motion profile for smooth movement"""
     max_velocity: float = 1.0
@@ -53,10 +69,18 @@ class MotionController:
         self.max_linear_vel = self.motion_config.get('max_linear_velocity', 1.5)
         self.max_angular_vel = self.motion_config.get('max_angular_velocity', 2.0)
         
+        # Clamp bounds resolved once for the velocity hot path
+        self._lin_lo, self._lin_hi = -self.max_linear_vel, self.max_linear_vel
+        self._ang_lo, self._ang_hi = -self.max_angular_vel, self.max_angular_vel
+        
         # Current motion state
-        self.current_trajectory: list[TrajectoryPoint] = []
+        self.current_trajectory: np.ndarray = np.empty((0, 5), dtype=np.float32)
+        self.current_velocities: np.ndarray = np.empty((0, 3), dtype=np.float32)
+        self.velocity_valid: np.ndarray = np.empty(0, dtype=bool)
         self.trajectory_index = 0
         self.is_executing_trajectory = False
+        # Set while a trajectory is active; the control loop sleeps on it when idle
+        self._trajectory_event = asyncio.Event()
         
         # Motion profile
         self.motion_profile = MotionProfile(
@@ -66,6 +90,9 @@ class MotionController:
             max_angular_acceleration=2.0
         )
         
+        # Reused motion command; RobotManager reads or packs its fields before returning and keeps no reference
+        self._cmd_buf = MotionCommand()
+        
         # Control loop task
         self.control_task: Optional[asyncio.Task] = None
         self.running = False
@@ -101,24 +128,19 @@ class MotionController:
         """Move robot with specified velocities"""
         try:
             # Clamp velocities to safe limits
-            linear_x = max(-self.max_linear_vel, min(self.max_linear_vel, linear_x))
-            linear_y = max(-self.max_linear_vel, min(self.max_linear_vel, linear_y))
-            angular_z = max(-self.max_angular_vel, min(self.max_angular_vel, angular_z))
+            lin_lo, lin_hi = self._lin_lo, self._lin_hi
+            linear_x = max(lin_lo, min(lin_hi, linear_x))
+            linear_y = max(lin_lo, min(lin_hi, linear_y))
+            angular_z = max(self._ang_lo, min(self._ang_hi, angular_z))
             
-            # Create motion command
-            command = MotionCommand(
-                linear_x=linear_x,
-                linear_y=linear_y,
-                angular_z=angular_z,
-                step_height=step_height,
-                gait_type=gait.value
-            )
+            # Fill motion command
+            command = self._fill_command(linear_x, linear_y, angular_z, step_height, gait.value)
             
             # Send command
             success = await self.robot_manager.send_motion_command(command)
             
             if success:
-                self.logger.debug(f"Velocity command sent: x={linear_x:.2f}, y={linear_y:.2f}, z={angular_z:.2f}")
+                self.logger.debug("Velocity command sent: x=%.2f, y=%.2f, z=%.2f", linear_x, linear_y, angular_z)
             
             return success
             
@@ -148,16 +170,23 @@ class MotionController:
             self.logger.error(f"Failed to move to position: {e}")
             return False
     
-    async def execute_trajectory(self, trajectory: list[TrajectoryPoint]) -> bool:
+    async def execute_trajectory(self, trajectory: Union[np.ndarray, Sequence[TrajectoryPoint]]) -> bool:
         """Execute a planned trajectory"""
         try:
             if self.is_executing_trajectory:
                 self.logger.warning("Already executing trajectory, stopping current one")
                 await self.stop_trajectory()
             
+            if not isinstance(trajectory, np.ndarray):
+                trajectory = np.array(
+                    [(p.x, p.y, p.z, p.yaw, p.timestamp) for p in trajectory], dtype=np.float32
+                ).reshape(-1, 5)
+            
             self.current_trajectory = trajectory
+            self.current_velocities, self.velocity_valid = self._trajectory_velocities(trajectory)
             self.trajectory_index = 0
             self.is_executing_trajectory = True
+            self._trajectory_event.set()
             
             self.logger.info(f"Starting trajectory execution with {len(trajectory)} points")
             
@@ -168,17 +197,24 @@ class MotionController:
             self.logger.error(f"Failed to execute trajectory: {e}")
             return False
     
-    async def stop_trajectory(self):
-        """Stop current trajectory execution"""
+    def _clear_trajectory(self):
+        """Drop the active trajectory and release its arrays"""
         self.is_executing_trajectory = False
-        self.current_trajectory.clear()
+        self._trajectory_event.clear()
+        self.current_trajectory = np.empty((0, 5), dtype=np.float32)
+        self.current_velocities = np.empty((0, 3), dtype=np.float32)
+        self.velocity_valid = np.empty(0, dtype=bool)
         self.trajectory_index = 0
+    
+    async def stop_trajectory(self):
+        """Stop current trajectory execution"""
+        self._clear_trajectory()
         await self.stop_motion()
         self.logger.info("Trajectory execution stopped")
     
     async def stop_motion(self):
         """Stop all robot motion"""
-        stop_command = MotionCommand()  # All zeros
+        stop_command = self._fill_command()  # All zeros
         await self.robot_manager.send_motion_command(stop_command)
     
     async def change_gait(self, gait: GaitType) -> bool:
@@ -187,12 +223,8 @@ class MotionController:
             # Get current motion state and update gait
             current_state = self.robot_manager.robot_state
             
-            command = MotionCommand(
-                linear_x=0.0,  # Maintain current velocity or stop
-                linear_y=0.0,
-                angular_z=0.0,
-                gait_type=gait.value
-            )
+            # Maintain current velocity or stop
+            command = self._fill_command(gait_type=gait.value)
             
             success = await self.robot_manager.send_motion_command(command)
             
@@ -211,12 +243,7 @@ class MotionController:
             # Clamp step height to reasonable limits
             height = max(0.05, min(0.2, height))
             
-            command = MotionCommand(
-                linear_x=0.0,
-                linear_y=0.0,
-                angular_z=0.0,
-                step_height=height
-            )
+            command = self._fill_command(step_height=height)
             
             success = await self.robot_manager.send_motion_command(command)
             
@@ -229,14 +256,25 @@ class MotionController:
             self.logger.error(f"Failed to set step height: {e}")
             return False
     
+    def _fill_command(self, linear_x: float = 0.0, linear_y: float = 0.0, angular_z: float = 0.0,
+                      step_height: float = 0.1, gait_type: str = "trot") -> MotionCommand:
+        """Overwrite the reusable command buffer in place and return it"""
+        command = self._cmd_buf
+        command.linear_x = linear_x
+        command.linear_y = linear_y
+        command.angular_z = angular_z
+        command.step_height = step_height
+        command.gait_type = gait_type
+        return command
+    
     def _plan_trajectory(self, start: Tuple[float, float, float], 
-                        end: Tuple[float, float, float], max_speed: float) -> list[TrajectoryPoint]:
-        """Plan a smooth trajectory between two points"""
+                        end: Tuple[float, float, float], max_speed: float) -> np.ndarray:
+        """Plan a smooth trajectory between two points as an (N, 5) array"""
         start_x, start_y, start_yaw = start
         end_x, end_y, end_yaw = end
         
         # Calculate distance and time
-        distance = math.sqrt((end_x - start_x)**2 + (end_y - start_y)**2)
+        distance = math.hypot(end_x - start_x, end_y - start_y)
         angular_distance = abs(end_yaw - start_yaw)
         
         # Estimate travel time
@@ -245,26 +283,35 @@ class MotionController:
         total_time = max(linear_time, angular_time, 1.0)  # Minimum 1 second
         
         # Generate trajectory points
-        trajectory = []
         num_points = max(10, int(total_time * 10))  # 10 points per second
+        t = np.linspace(0.0, 1.0, num_points + 1, dtype=np.float32)
         
-        for i in range(num_points + 1):
-            t = i / num_points
-            
-            # Smooth interpolation using cubic easing
-            smooth_t = self._smooth_step(t)
-            
-            x = start_x + (end_x - start_x) * smooth_t
-            y = start_y + (end_y - start_y) * smooth_t
-            yaw = start_yaw + (end_yaw - start_yaw) * smooth_t
-            
-            timestamp = t * total_time
-            
-            trajectory.append(TrajectoryPoint(x, y, 0.0, yaw, timestamp))
+        # Smooth interpolation using cubic easing
+        smooth_t = self._smooth_step(t)
+        
+        trajectory = np.empty((num_points + 1, 5), dtype=np.float32)
+        trajectory[:, TRAJ_X] = start_x + (end_x - start_x) * smooth_t
+        trajectory[:, TRAJ_Y] = start_y + (end_y - start_y) * smooth_t
+        trajectory[:, TRAJ_Z] = 0.0
+        trajectory[:, TRAJ_YAW] = start_yaw + (end_yaw - start_yaw) * smooth_t
+        trajectory[:, TRAJ_T] = t * total_time
         
         return trajectory
     
-    def _smooth_step(self, t: float) -> float:
+    def _trajectory_velocities(self, trajectory: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Differentiate a trajectory once into per-segment (vx, vy, wz) commands
+        
+        Returns the (N-1, 3) velocity array and a mask of segments with a
+        positive duration; segments without one produce no command.
+        """
+        dt = np.diff(trajectory[:, TRAJ_T])
+        valid = dt > 0
+        deltas = np.diff(trajectory[:, [TRAJ_X, TRAJ_Y, TRAJ_YAW]], axis=0)
+        velocities = np.zeros_like(deltas)
+        np.divide(deltas, dt[:, None], out=velocities, where=valid[:, None])
+        return velocities, valid
+    
+    def _smooth_step(self, t):
         """Smooth step function for trajectory interpolation"""
         # Smoothstep function: 3t² - 2t³
         return t * t * (3.0 - 2.0 * t)
@@ -274,12 +321,26 @@ class MotionController:
         control_rate = 20.0  # 20 Hz control rate
         dt = 1.0 / control_rate
         
+        # Sleep to absolute deadlines so step cost does not stretch the period
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        
         while self.running:
             try:
-                if self.is_executing_trajectory and self.current_trajectory:
+                if not self.is_executing_trajectory:
+                    # Idle: no wakeups until execute_trajectory() hands over work
+                    await self._trajectory_event.wait()
+                    next_tick = loop.time()
+                
+                if self.is_executing_trajectory:
                     await self._execute_trajectory_step()
                 
-                await asyncio.sleep(dt)
+                next_tick += dt
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    # Fell behind (e.g. a stall); restart the schedule instead of bursting
+                    next_tick = loop.time()
+                await asyncio.sleep(max(0.0, delay))
                 
             except asyncio.CancelledError:
                 break
@@ -289,26 +350,19 @@ class MotionController:
     
     async def _execute_trajectory_step(self):
         """Execute one step of the current trajectory"""
-        if not self.current_trajectory or self.trajectory_index >= len(self.current_trajectory):
-            self.is_executing_trajectory = False
+        index = self.trajectory_index
+        if index >= len(self.current_trajectory):
+            # Release the finished trajectory instead of keeping it alive until the next plan
+            self._clear_trajectory()
             await self.stop_motion()
             self.logger.info("Trajectory execution completed")
             return
         
-        current_point = self.current_trajectory[self.trajectory_index]
-        next_index = self.trajectory_index + 1
-        
-        if next_index < len(self.current_trajectory):
-            next_point = self.current_trajectory[next_index]
+        # Velocities were precomputed when the trajectory was loaded
+        if index < len(self.current_velocities) and self.velocity_valid[index]:
+            linear_x, linear_y, angular_z = self.current_velocities[index].tolist()
             
-            # Calculate velocity commands
-            dt = next_point.timestamp - current_point.timestamp
-            if dt > 0:
-                linear_x = (next_point.x - current_point.x) / dt
-                linear_y = (next_point.y - current_point.y) / dt
-                angular_z = (next_point.yaw - current_point.yaw) / dt
-                
-                # Send velocity command
-                await self.move_velocity(linear_x, linear_y, angular_z)
+            # Send velocity command
+            await self.move_velocity(linear_x, linear_y, angular_z)
         
         self.trajectory_index += 1
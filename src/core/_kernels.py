@@ -0,0 +1,63 @@
+"""
+Numeric kernels for the robot manager and ROS 2 client hot loops
+
+Compiled with Numba when it is installed; otherwise the same checks run as
+vectorized NumPy or plain Python expressions. Kernels declare explicit signatures so they
+compile eagerly at import (and load from the on-disk cache afterwards)
+instead of on the first call from the monitoring loop.
+"""
+
+from math import asin, atan2, copysign, pi
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional
+    njit = None
+
+
+def _joints_within_limits_loop(joints, lower, upper):
+    """Return True if every joint position lies within [lower, upper]"""
+    for i in range(joints.shape[0]):
+        # Written as a negated range check so a NaN reading (sensor fault) fails it, as in NumPy
+        if not (lower[i] <= joints[i] <= upper[i]):
+            return False
+    return True
+
+
+def _joints_within_limits_numpy(joints, lower, upper):
+    """Return True if every joint position lies within [lower, upper]"""
+    return bool(np.all((joints >= lower) & (joints <= upper)))
+
+
+# joints, lower, upper: float32 1-D arrays
+_JOINTS_WITHIN_LIMITS_SIG = 'b1(f4[:], f4[:], f4[:])'
+
+if njit is not None:
+    joints_within_limits = njit(_JOINTS_WITHIN_LIMITS_SIG, cache=True)(_joints_within_limits_loop)
+else:
+    joints_within_limits = _joints_within_limits_numpy
+
+
+def _quat_to_rpy(x, y, z, w):
+    """Convert a unit quaternion to (roll, pitch, yaw) in radians"""
+    roll = atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+
+    sinp = 2 * (w * y - z * x)
+    if abs(sinp) >= 1:
+        pitch = copysign(pi / 2, sinp)
+    else:
+        pitch = asin(sinp)
+
+    yaw = atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return (roll, pitch, yaw)
+
+
+# x, y, z, w: float64 scalars -> (roll, pitch, yaw)
+_QUAT_TO_RPY_SIG = 'UniTuple(f8, 3)(f8, f8, f8, f8)'
+
+if njit is not None:
+    quat_to_rpy = njit(_QUAT_TO_RPY_SIG, cache=True, fastmath=True)(_quat_to_rpy)
+else:
+    quat_to_rpy = _quat_to_rpy
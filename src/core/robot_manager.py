@@ -3,19 +3,53 @@ Robot Manager - Core class for managing Unitree Go2 robot connection and control
 """
 
 import asyncio
+import inspect
 import logging
 import math
 import socket
 import struct
 import time
-from typing import Dict, Any, Optional, Callable
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Iterable
 from enum import Enum
 
+import numpy as np
+
 from utils.logger import get_logger
 from core.ros2_client import ROS2Client
 from core.webrtc_client import WebRTCClient
 from core.unitree_webrtc_client import UnitreeWebRTCClient
+from core._kernels import joints_within_limits
+from core.uring_sender import UringSender, uring_available
+
+# Packet layouts (mock protocol), compiled once instead of re-parsed on every send
+# Motion packet: version, then linear_x, linear_y, angular_z, step_height as int16 fixed point
+# (value = raw / _MOTION_SCALE, i.e. +/-3.2767 full scale at 0.1 mm/s resolution)
+_MOTION_STRUCT = struct.Struct('<Bhhhh')
+_MOTION_VERSION = 2  # 1 was four float32 fields
+_MOTION_SCALE = 10000.0
+_MOTION_LIMIT = 32767 / _MOTION_SCALE  # largest magnitude a packet field can carry
+_MODE_HEADER = b'\xAA\xBB\x01'  # header, command type (mode change); mode and checksum follow
+
+_PING = b'\x00\x01\x02\x03'
+_HEARTBEAT = b'\xFF\xFE\xFD\xFC'  # Heartbeat signature
+_PING_TIMEOUT = 0.1
+
+# Monitoring loop pacing: wake on new data but at most at 100 Hz; tick at 10 Hz without data
+_STATE_MIN_PERIOD = 0.01
+_STATE_IDLE_PERIOD = 0.1
+
+_INV_HOUR = 1.0 / 3600.0
+
+# UDP socket tuning: larger kernel buffers absorb bursts; TOS 0x10 requests low delay
+_SOCKET_BUFFER_SIZE = 1 << 20
+_IPTOS_LOWDELAY = 0x10
+
+# Outgoing UDP queue bounds
+_TX_QUEUE_SIZE = 256
+_TX_BATCH = 64  # matches the io_uring submission depth, so a burst is one submission
+
+# UDP motion commands are coalesced latest-wins: at most one packet per window
+_MOTION_PERIOD = 0.02
 
 
 class RobotMode(Enum):
@@ -29,32 +63,96 @@ class RobotMode(Enum):
     LIE = 6
 
 
-@dataclass
+def _build_mode_packet(mode: RobotMode) -> bytes:
+    """Build the mode change packet: [header][command_type][mode][checksum]"""
+    body = _MODE_HEADER + bytes((mode.value,))
+    return body + bytes((sum(body) & 0xFF,))
+
+
+# Mode packets depend only on the mode, so they are built once at import
+_MODE_PACKETS = {mode: _build_mode_packet(mode) for mode in RobotMode}
+
+
+NUM_JOINTS = 12  # 12 joints for quadruped
+
+# Telemetry packet layout (mock protocol, little-endian, unpadded); parsed with one frombuffer call
+STATE_PACKET_DTYPE = np.dtype([
+    ('mode', 'u1'),
+    ('battery', '<f4'),
+    ('temperature', '<f4'),
+    ('position', '<f4', 3),
+    ('orientation', '<f4', 3),
+    ('velocity', '<f4', 3),
+    ('joints', '<f4', NUM_JOINTS),
+])
+
+
 class RobotState:
     """Robot state data structure"""
-    mode: RobotMode = RobotMode.IDLE
-    battery_level: float = 0.0
-    temperature: float = 0.0
-    position: tuple = (0.0, 0.0, 0.0)  # x, y, z
-    orientation: tuple = (0.0, 0.0, 0.0)  # roll, pitch, yaw
-    velocity: tuple = (0.0, 0.0, 0.0)  # linear and angular velocities
-    joint_positions: Optional[list] = None
-    is_connected: bool = False
-    last_update: float = 0.0
-    
-    def __post_init__(self):
-        if self.joint_positions is None:
-            self.joint_positions = [0.0] * 12  # 12 joints for quadruped
-
-
-@dataclass
+    __slots__ = ('mode', 'battery_level', 'temperature', 'position', 'orientation',
+                 'velocity', 'joint_positions', 'is_connected', 'last_update')
+    
+    def __init__(self, mode: RobotMode = RobotMode.IDLE, battery_level: float = 0.0,
+                 temperature: float = 0.0, position: tuple = (0.0, 0.0, 0.0),
+                 orientation: tuple = (0.0, 0.0, 0.0), velocity: tuple = (0.0, 0.0, 0.0),
+                 joint_positions: Optional[Iterable[float]] = None, is_connected: bool = False,
+                 last_update: float = 0.0):
+        self.mode = mode
+        self.battery_level = battery_level
+        self.temperature = temperature
+        self.position = position  # x, y, z
+        self.orientation = orientation  # roll, pitch, yaw
+        self.velocity = velocity  # linear and angular velocities
+        # Fixed-size float32 array; update in place (joint_positions[:] = ...) rather than rebinding
+        self.joint_positions = np.zeros(NUM_JOINTS, dtype=np.float32)
+        if joint_positions is not None:
+            self.joint_positions[:] = joint_positions
+        self.is_connected = is_connected
+        self.last_update = last_update
+    
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"RobotState({fields})"
+
+
 class MotionCommand:
     """Motion command data structure"""
-    linear_x: float = 0.0
-    linear_y: float = 0.0
-    angular_z: float = 0.0
-    step_height: float = 0.1
-    gait_type: str = "trot"
+    __slots__ = ('linear_x', 'linear_y', 'angular_z', 'step_height', 'gait_type')
+    
+    def __init__(self, linear_x: float = 0.0, linear_y: float = 0.0, angular_z: float = 0.0,
+                 step_height: float = 0.1, gait_type: str = "trot"):
+        self.linear_x = linear_x
+        self.linear_y = linear_y
+        self.angular_z = angular_z
+        self.step_height = step_height
+        self.gait_type = gait_type
+    
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"MotionCommand({fields})"
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol that hands replies to whoever is waiting for one and telemetry to on_state"""
+    
+    def __init__(self, on_state: Callable[[bytes], None], logger: logging.Logger):
+        self.reply = None
+        self.on_state = on_state
+        self.logger = logger
+    
+    def expect_reply(self) -> asyncio.Future:
+        self.reply = asyncio.get_running_loop().create_future()
+        return self.reply
+    
+    def datagram_received(self, data, addr):
+        if self.reply is not None and not self.reply.done():
+            self.reply.set_result(data)
+        elif len(data) == STATE_PACKET_DTYPE.itemsize:
+            self.on_state(data)
+    
+    def error_received(self, exc):
+        # e.g. ICMP port unreachable reported on the connected socket; sends keep going
+        self.logger.debug("UDP transport error: %s", exc)
 
 
 class RobotManager:
@@ -71,6 +169,8 @@ class RobotManager:
 
         # Communication protocol
         self.protocol = (self.comm_config.get('protocol') or 'udp').lower()
+        # UDP send backend: 'asyncio' (default) or 'io_uring' (Linux 6.x with liburing)
+        self.backend = (self.comm_config.get('backend') or 'asyncio').lower()
         self.ros2_client = None
         self.webrtc_client = None
 
@@ -78,21 +178,56 @@ class RobotManager:
         self.robot_ip = self.robot_config.get('ip_address', '192.168.123.161')
         self.udp_port = self.robot_config.get('udp_port', 8082)
         self.timeout = self.robot_config.get('timeout', 5.0)
+        self._addr = (self.robot_ip, self.udp_port)
+        self._sendto = None
+        self._tx_queue = asyncio.Queue(maxsize=_TX_QUEUE_SIZE)
+        self.writer_task = None
+        self._uring = None
+        self._pending_packet = None  # packed when queued, so later changes to the command can't leak in
+        self._motion_flush = None  # TimerHandle for the pending packet, if any
+        self._next_motion_time = 0.0
+
+        # Reusable packet buffers; sendto copies them before returning
+        self._motion_buf = bytearray(_MOTION_STRUCT.size)
+        self._motion_mv = memoryview(self._motion_buf)
+        self._build_packet_cache()
+
+        # Motion limits, read once; every command is validated against them
+        self._max_linear = self._motion_limit('max_speed', 1.5)
+        self._max_angular = self._motion_limit('max_angular_speed', 2.0)
 
         # State management
         self.robot_state = RobotState()
         self.is_connected = False
-        self.socket = None
+        self.transport = None
+        self._protocol = None
         self.monitoring_task = None
-        self.command_task = None
 
-        # Callbacks
-        self.state_callbacks = []
-        self.error_callbacks = []
+        # Callbacks (split at registration so sync ones are called without an await).
+        # Immutable tuples, rebuilt on the rare registration, so iteration never sees a mutation.
+        self.state_callbacks = ()
+        self.async_state_callbacks = ()
+        self.error_callbacks = ()
+        self.async_error_callbacks = ()
+
+        # Simulation baseline (used while no real robot data is available)
+        self._sim_enabled = self.robot_config.get('simulate_when_disconnected', True)
+        self._sim_battery_base = 90.0
+        self._sim_start_time = time.monotonic()
+        self._sim_position_base = (0.0, 0.0)
+
+        # Set whenever fresh robot data lands (ROS 2 spin thread, WebRTC callback, UDP telemetry)
+        self._state_updated = asyncio.Event()
 
         # Safety
         self.emergency_stop = False
         self.last_heartbeat = 0.0
+        boundaries = self.safety_config.get('boundaries', {})
+        self._min_battery = float(boundaries.get('min_battery_level', 20))
+        self._max_temp = float(boundaries.get('max_temperature', 65))
+        self._joint_min, self._joint_max = self._joint_limit_arrays()
+        self._joint_limits_exceeded = False
+        self._have_joint_data = False  # set once a real joint reading arrives (ROS 2 never sends one)
 
         self.logger.info(f"Robot Manager initialized (protocol={self.protocol})")
     
@@ -100,6 +235,7 @@ class RobotManager:
         """Initialize the robot manager"""
         try:
             self.logger.info("Initializing robot manager...")
+            self.logger.info(f"Event loop: {type(asyncio.get_running_loop()).__name__}")
             
             # Validate configuration
             if not self._validate_config():
@@ -117,6 +253,10 @@ class RobotManager:
                     # Fallback to UDP mock
                     self.protocol = 'udp'
                 else:
+                    # Subscriber callbacks run on the ROS 2 spin thread
+                    loop = asyncio.get_running_loop()
+                    self.ros2_client.set_update_callback(
+                        lambda: loop.call_soon_threadsafe(self._state_updated.set))
                     self.logger.info("ROS 2 transport ready")
             elif self.protocol == 'webrtc':
                 self.logger.info("Initializing WebRTC transport...")
@@ -141,7 +281,7 @@ class RobotManager:
                 # In ROS 2 mode, initialization already created the node and pubs/subs
                 self.is_connected = True
                 self.robot_state.is_connected = True
-                self.last_heartbeat = time.time()
+                self.last_heartbeat = time.monotonic()
                 self.logger.info("Connected (ROS 2 mode)")
                 return True
             elif self.protocol == 'webrtc':
@@ -150,7 +290,7 @@ class RobotManager:
                 if self.webrtc_client and await self.webrtc_client.connect():
                     self.is_connected = True
                     self.robot_state.is_connected = True
-                    self.last_heartbeat = time.time()
+                    self.last_heartbeat = time.monotonic()
                     self.logger.info("Successfully connected via WebRTC")
                     return True
                 else:
@@ -158,14 +298,27 @@ class RobotManager:
                     return False
             else:
                 self.logger.info(f"Connecting to robot at {self.robot_ip}:{self.udp_port} (UDP mode)")
-                # Create UDP socket
-                self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                self.socket.settimeout(self.timeout)
+                self.logger.warning("MOCK MODE: UDP motion packets use a placeholder format - robot will ignore them")
+                # Create UDP endpoint; transport.sendto never blocks the event loop
+                loop = asyncio.get_running_loop()
+                sock = self._create_udp_socket()
+                try:
+                    await loop.sock_connect(sock, self._addr)
+                    self.transport, self._protocol = await loop.create_datagram_endpoint(
+                        lambda: _UDPProtocol(self._parse_state, self.logger), sock=sock
+                    )
+                except Exception:
+                    sock.close()
+                    raise
+                self._sendto = self.transport.sendto
+                if self.backend == 'io_uring':
+                    self._start_uring()
+                self.writer_task = asyncio.create_task(self._writer_loop())
                 # Test connection with ping
                 if await self._test_connection():
                     self.is_connected = True
                     self.robot_state.is_connected = True
-                    self.last_heartbeat = time.time()
+                    self.last_heartbeat = time.monotonic()
                     self.logger.info("Successfully connected to robot")
                     return True
                 else:
@@ -181,15 +334,20 @@ class RobotManager:
         try:
             self.logger.info("Disconnecting from robot...")
             
-            # Stop monitoring tasks
+            # Stop monitoring task
             if self.monitoring_task:
                 self.monitoring_task.cancel()
-                
-            if self.command_task:
-                self.command_task.cancel()
             
             # Send stop command before disconnecting
-            await self.send_motion_command(MotionCommand())
+            await self._send_stop()
+            
+            if self.writer_task:
+                self.writer_task.cancel()
+                self.writer_task = None
+            
+            if self._uring:
+                self._uring.close()
+                self._uring = None
 
             if self.protocol == 'ros2':
                 if self.ros2_client:
@@ -198,13 +356,16 @@ class RobotManager:
                 if self.webrtc_client:
                     await self.webrtc_client.disconnect()
             else:
-                # Close socket
-                if self.socket:
-                    self.socket.close()
-                    self.socket = None
+                # Close transport
+                if self.transport:
+                    self.transport.close()
+                    self.transport = None
+                    self._protocol = None
+                    self._sendto = None
             
             self.is_connected = False
             self.robot_state.is_connected = False
+            self._have_joint_data = False
             
             self.logger.info("Disconnected from robot")
             
@@ -217,76 +378,71 @@ class RobotManager:
             return
         
         def on_robot_data(data):
-            """Handle all robot data from Unitree WebRTC SDK"""
+            """Handle all robot data from Unitree WebRTC SDK (a SensorSnapshot shared by all callbacks)"""
             try:
+                state = self.robot_state
+                
                 # Update battery data
-                if 'battery' in data:
-                    battery = data['battery']
-                    self.robot_state.battery_level = battery.get('level', 0)
-                    if 'temperature' in battery:
-                        self.robot_state.temperature = battery['temperature']
+                battery = data.battery
+                state.battery_level = battery.get('level', 0)
+                if 'temperature' in battery:
+                    state.temperature = battery['temperature']
                 
                 # Update IMU/orientation data
-                if 'imu' in data:
-                    imu = data['imu']
-                    self.robot_state.orientation = (
-                        imu.get('roll', 0),
-                        imu.get('pitch', 0), 
-                        imu.get('yaw', 0)
-                    )
+                imu = data.imu
+                state.orientation = (
+                    imu.get('roll', 0),
+                    imu.get('pitch', 0), 
+                    imu.get('yaw', 0)
+                )
                 
                 # Update position data
-                if 'position' in data:
-                    pos = data['position']
-                    self.robot_state.position = (
-                        pos.get('x', 0),
-                        pos.get('y', 0),
-                        pos.get('z', 0)
-                    )
+                pos = data.position
+                state.position = (
+                    pos.get('x', 0),
+                    pos.get('y', 0),
+                    pos.get('z', 0)
+                )
                 
                 # Update velocity data
-                if 'velocity' in data:
-                    vel = data['velocity']
-                    # Store linear velocities, angular velocity in yaw
-                    self.robot_state.velocity = (
-                        vel.get('x', 0),
-                        vel.get('y', 0), 
-                        0.0  # placeholder for angular velocity if needed
-                    )
+                vel = data.velocity
+                # Store linear velocities, angular velocity in yaw
+                state.velocity = (
+                    vel.get('x', 0),
+                    vel.get('y', 0), 
+                    0.0  # placeholder for angular velocity if needed
+                )
                 
                 # Update motor/joint data
-                if 'motors' in data and data['motors']:
-                    joint_positions = []
-                    for motor in data['motors']:
-                        joint_positions.append(motor.get('position', 0))
-                    
-                    # Ensure we have 12 positions (pad or truncate as needed)
-                    while len(joint_positions) < 12:
-                        joint_positions.append(0.0)
-                    self.robot_state.joint_positions = joint_positions[:12]
+                count = min(data.motor_count, NUM_JOINTS)
+                if count:
+                    # Fill in place; missing joints are zeroed
+                    joints = state.joint_positions
+                    joints[:count] = data.motors['position'][:count]
+                    joints[count:] = 0.0
+                    self._have_joint_data = True
                 
                 # Update mode from robot data
-                if 'mode' in data:
-                    mode_id = data['mode']
-                    # Map Unitree mode to our RobotMode enum
-                    mode_map = {
-                        0: RobotMode.IDLE,
-                        1: RobotMode.STAND, 
-                        2: RobotMode.WALK,
-                        3: RobotMode.RUN,
-                        4: RobotMode.SIT,
-                        5: RobotMode.LIE
-                    }
-                    self.robot_state.mode = mode_map.get(mode_id, RobotMode.IDLE)
+                # Map Unitree mode to our RobotMode enum
+                mode_map = {
+                    0: RobotMode.IDLE,
+                    1: RobotMode.STAND, 
+                    2: RobotMode.WALK,
+                    3: RobotMode.RUN,
+                    4: RobotMode.SIT,
+                    5: RobotMode.LIE
+                }
+                state.mode = mode_map.get(data.mode, RobotMode.IDLE)
                 
                 # Update connection status
-                self.robot_state.is_connected = data.get('connected', False)
-                self.robot_state.last_update = time.time()
+                state.is_connected = data.connected
+                state.last_update = time.time()
                 
                 # Update heartbeat
-                self.last_heartbeat = time.time()
+                self.last_heartbeat = time.monotonic()
+                self._state_updated.set()
                 
-                self.logger.debug(f"Unitree WebRTC: Robot data updated - Battery: {self.robot_state.battery_level}%")
+                self.logger.debug("Unitree WebRTC: Robot data updated - Battery: %s%%", state.battery_level)
                 
             except Exception as e:
                 self.logger.error(f"Error processing Unitree WebRTC data: {e}")
@@ -299,12 +455,11 @@ class RobotManager:
     async def start_monitoring(self):
         """Start robot state monitoring"""
         self.monitoring_task = asyncio.create_task(self._monitoring_loop())
-        self.command_task = asyncio.create_task(self._command_loop())
     
     async def send_motion_command(self, command: MotionCommand) -> bool:
         """Send motion command to robot"""
         try:
-            if not self.is_connected or self.emergency_stop:
+            if not self._can_transmit():
                 return False
             
             # Validate command limits
@@ -315,7 +470,7 @@ class RobotManager:
                 # Publish Twist
                 if self.ros2_client:
                     self.ros2_client.publish_twist(command.linear_x, command.linear_y, command.angular_z)
-                self.logger.debug(f"ROS 2: Published motion command: {command}")
+                self.logger.debug("ROS 2: Published motion command: %s", command)
             elif self.protocol == 'webrtc':
                 # Send via Unitree WebRTC SDK
                 if self.webrtc_client:
@@ -330,16 +485,14 @@ class RobotManager:
                             command.linear_y, 
                             command.angular_z
                         )
-                self.logger.debug(f"Unitree WebRTC: Sent motion command: {command}")
+                self.logger.debug("Unitree WebRTC: Sent motion command: %s", command)
             else:
-                # Create command packet (UDP/mock)
-                packet = self._create_motion_packet(command)
-                # Send command
-                if not self.socket:
-                    self.logger.error("UDP socket not initialized; cannot send motion packet")
+                if not self.transport:
+                    self.logger.error("UDP transport not initialized; cannot send motion packet")
                     return False
-                self.socket.sendto(packet, (self.robot_ip, self.udp_port))
-                self.logger.debug(f"UDP: Sent motion command: {command}")
+                # Latest command wins; it is packed now and sent when its window opens
+                self._queue_motion_command(command)
+                self.logger.debug("UDP: Queued motion command: %s", command)
             return True
             
         except Exception as e:
@@ -351,18 +504,25 @@ class RobotManager:
         self.emergency_stop = True
         self.logger.warning("Emergency stop activated!")
         
-        # Send stop command
-        stop_command = MotionCommand()
-        await self.send_motion_command(stop_command)
+        # Send stop command (the emergency_stop flag would make send_motion_command refuse it)
+        await self._send_stop()
         
-        # Notify callbacks
+        # Notify callbacks; a failing callback must not keep the others from hearing about it
         for callback in self.error_callbacks:
-            await callback("emergency_stop", "Emergency stop activated")
+            try:
+                callback("emergency_stop", "Emergency stop activated")
+            except Exception as e:
+                self.logger.error(f"Error callback failed: {e}")
+        if self.async_error_callbacks:
+            results = await asyncio.gather(*(callback("emergency_stop", "Emergency stop activated")
+                                             for callback in self.async_error_callbacks),
+                                           return_exceptions=True)
+            self._log_callback_errors("Error", results)
     
     async def stand_up(self) -> bool:
         """Command the robot to stand up"""
         try:
-            if not self.is_connected or self.emergency_stop:
+            if not self._can_transmit():
                 self.logger.warning("Cannot stand up: robot not connected or emergency stop active")
                 return False
             
@@ -384,13 +544,11 @@ class RobotManager:
                     else:
                         self.logger.info("Unitree WebRTC stand command succeeded")
             else:
-                # Create stand command packet
-                stand_packet = self._create_mode_packet(RobotMode.STAND)
-                # Send command
-                if not self.socket:
-                    self.logger.error("UDP socket not initialized; cannot send stand packet")
+                # Send prebuilt stand command packet
+                if not self.transport:
+                    self.logger.error("UDP transport not initialized; cannot send stand packet")
                     return False
-                self.socket.sendto(stand_packet, (self.robot_ip, self.udp_port))
+                self._tx_queue.put_nowait(_MODE_PACKETS[RobotMode.STAND])
             
             # Update robot state
             self.robot_state.mode = RobotMode.STAND
@@ -405,7 +563,7 @@ class RobotManager:
     async def sit_down(self) -> bool:
         """Command the robot to sit down"""
         try:
-            if not self.is_connected or self.emergency_stop:
+            if not self._can_transmit():
                 self.logger.warning("Cannot sit down: robot not connected or emergency stop active")
                 return False
             
@@ -427,13 +585,11 @@ class RobotManager:
                     else:
                         self.logger.info("Unitree WebRTC sit command succeeded")
             else:
-                # Create sit command packet
-                sit_packet = self._create_mode_packet(RobotMode.SIT)
-                # Send command
-                if not self.socket:
-                    self.logger.error("UDP socket not initialized; cannot send sit packet")
+                # Send prebuilt sit command packet
+                if not self.transport:
+                    self.logger.error("UDP transport not initialized; cannot send sit packet")
                     return False
-                self.socket.sendto(sit_packet, (self.robot_ip, self.udp_port))
+                self._tx_queue.put_nowait(_MODE_PACKETS[RobotMode.SIT])
             
             # Update robot state
             self.robot_state.mode = RobotMode.SIT
@@ -447,11 +603,17 @@ class RobotManager:
     
     def register_state_callback(self, callback: Callable):
         """Register callback for state updates"""
-        self.state_callbacks.append(callback)
+        if inspect.iscoroutinefunction(callback):
+            self.async_state_callbacks = (*self.async_state_callbacks, callback)
+        else:
+            self.state_callbacks = (*self.state_callbacks, callback)
     
     def register_error_callback(self, callback: Callable):
         """Register callback for error notifications"""
-        self.error_callbacks.append(callback)
+        if inspect.iscoroutinefunction(callback):
+            self.async_error_callbacks = (*self.async_error_callbacks, callback)
+        else:
+            self.error_callbacks = (*self.error_callbacks, callback)
     
     async def _test_connection(self) -> bool:
         """Test connection to robot"""
@@ -464,12 +626,17 @@ class RobotManager:
                 # MOCK/UDP placeholder
                 self.logger.warning("MOCK MODE: Using placeholder connection test (UDP)")
                 # Send ping packet (mock - robot may ignore this)
-                ping_packet = b'\x00\x01\x02\x03'
-                if not self.socket:
-                    self.logger.error("UDP socket not initialized; cannot send ping packet")
+                if not self.transport:
+                    self.logger.error("UDP transport not initialized; cannot send ping packet")
                     return False
-                self.socket.sendto(ping_packet, (self.robot_ip, self.udp_port))
-                await asyncio.sleep(0.1)
+                reply = self._protocol.expect_reply()
+                self._sendto(_PING)
+                try:
+                    await asyncio.wait_for(reply, _PING_TIMEOUT)
+                    self.logger.info("Robot answered connection test")
+                    return True
+                except asyncio.TimeoutError:
+                    pass
                 self.logger.warning("MOCK MODE: Connection test passed (robot may not actually respond)")
                 return True
             
@@ -477,125 +644,281 @@ class RobotManager:
             self.logger.error(f"Connection test failed: {e}")
             return False
     
+    def _can_transmit(self) -> bool:
+        """True if commands may be sent: connected and no emergency stop latched"""
+        return self.is_connected and not self.emergency_stop
+    
+    async def _send_stop(self):
+        """Send a zero-velocity command right away, bypassing validation, coalescing and the e-stop latch"""
+        try:
+            if self.protocol == 'ros2':
+                if self.ros2_client:
+                    self.ros2_client.publish_stop()
+            elif self.protocol == 'webrtc':
+                if self.webrtc_client:
+                    await self.webrtc_client.stop_movement()
+            elif self.transport:
+                # Nothing queued before the stop may follow it, and the stop must not wait
+                # behind a full queue: discard what is queued and send the stop directly
+                self._drop_pending_packet()
+                self._drop_queued_packets()
+                if self._uring:
+                    self._uring.send_batch([self._stop_packet])  # after batches already handed over
+                else:
+                    self._sendto(self._stop_packet)
+        except Exception as e:
+            self.logger.error(f"Failed to send stop command: {e}")
+    
+    def _queue_motion_command(self, command: MotionCommand):
+        """Send now if the coalescing window is open, otherwise replace the pending packet"""
+        # Pack immediately: the caller may reuse or modify the command object after this returns
+        self._pending_packet = bytes(self._create_motion_packet(command))
+        if self._motion_flush is not None:
+            return  # already scheduled; it will pick up this packet
+        loop = asyncio.get_running_loop()
+        delay = self._next_motion_time - loop.time()
+        if delay <= 0:
+            self._flush_motion_command()
+        else:
+            self._motion_flush = loop.call_later(delay, self._flush_motion_command)
+    
+    def _flush_motion_command(self):
+        """Hand the pending motion packet to the writer and start the next window"""
+        self._motion_flush = None
+        packet = self._pending_packet
+        self._pending_packet = None
+        if packet is None or not self._can_transmit() or not self.transport:
+            return
+        try:
+            self._tx_queue.put_nowait(packet)
+        except asyncio.QueueFull:
+            self.logger.warning("UDP send queue full; dropping motion command")
+        self._next_motion_time = asyncio.get_running_loop().time() + _MOTION_PERIOD
+    
+    def _drop_pending_packet(self):
+        """Discard a coalesced motion packet that has not been sent yet"""
+        if self._motion_flush is not None:
+            self._motion_flush.cancel()
+            self._motion_flush = None
+        self._pending_packet = None
+    
+    def _drop_queued_packets(self):
+        """Discard packets still waiting for the writer task"""
+        queue = self._tx_queue
+        while not queue.empty():
+            queue.get_nowait()
+            queue.task_done()
+    
+    async def flush(self):
+        """Wait until all queued UDP packets have been handed to the transport"""
+        if self.writer_task and not self.writer_task.done():
+            await self._tx_queue.join()
+    
+    def _create_udp_socket(self) -> socket.socket:
+        """Create a non-blocking, close-on-exec UDP socket with explicit buffer sizes"""
+        sock_type = socket.SOCK_DGRAM | getattr(socket, 'SOCK_NONBLOCK', 0) | getattr(socket, 'SOCK_CLOEXEC', 0)
+        sock = socket.socket(socket.AF_INET, sock_type)
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SOCKET_BUFFER_SIZE)
+        if hasattr(socket, 'IP_TOS'):
+            try:
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, _IPTOS_LOWDELAY)
+            except OSError:
+                pass  # not permitted on every platform; purely advisory
+        return sock
+    
+    def _start_uring(self):
+        """Hand UDP sends to an io_uring thread, keeping the asyncio transport as fallback"""
+        if not uring_available():
+            self.logger.warning("io_uring backend requested but unavailable; using asyncio transport")
+            return
+        try:
+            fd = self.transport.get_extra_info('socket').fileno()
+            self._uring = UringSender(fd, self.logger)
+            self.logger.info("UDP sends using io_uring backend")
+        except OSError as e:
+            self.logger.warning(f"io_uring setup failed ({e}); using asyncio transport")
+    
+    async def _writer_loop(self):
+        """Drain queued UDP packets, sending each burst back to back"""
+        queue = self._tx_queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < _TX_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                if self._uring:
+                    # One submission for the whole burst
+                    self._uring.send_batch(batch)
+                else:
+                    for packet in batch:
+                        self._sendto(packet)
+            except Exception as e:
+                self.logger.error(f"Failed to send UDP packet: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
     async def _monitoring_loop(self):
-        """Main monitoring loop"""
+        """Main monitoring loop; also sends the heartbeat, which is due far less often than a state tick"""
+        # Hoisted out of the loop; the state is updated in place, never rebound
+        state = self.robot_state
+        update_state = self._update_robot_state
+        check_safety = self._check_safety_conditions
+        send_heartbeats = self.protocol != 'ros2'
+        state_updated = self._state_updated
+        loop = asyncio.get_running_loop()
+        
         while self.is_connected:
             try:
+                tick_start = loop.time()
+                
                 # Update robot state
-                await self._update_robot_state()
+                await update_state()
                 
                 # Check safety conditions
-                self._check_safety_conditions()
+                check_safety()
                 
-                # Notify state callbacks
-                for callback in self.state_callbacks:
-                    await callback(self.robot_state)
+                # Notify state callbacks (snapshot the tuples; registration rebinds them)
+                callbacks = self.state_callbacks
+                async_callbacks = self.async_state_callbacks
+                for callback in callbacks:
+                    try:
+                        callback(state)
+                    except Exception as e:
+                        self.logger.error(f"State callback failed: {e}")
+                if async_callbacks:
+                    results = await asyncio.gather(*(callback(state) for callback in async_callbacks),
+                                                   return_exceptions=True)
+                    self._log_callback_errors("State", results)
                 
-                # Adjust loop frequency based on connection status
-                if self.robot_state.is_connected and self.robot_state.last_update > 0:
-                    await asyncio.sleep(0.01)  # 100 Hz when connected and receiving data
-                else:
-                    await asyncio.sleep(0.1)   # 10 Hz when not connected or no data
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Monitoring loop error: {e}")
-                await asyncio.sleep(1.0)
-    
-    async def _command_loop(self):
-        """Command processing loop"""
-        while self.is_connected:
-            try:
-                # Send heartbeat
-                current_time = time.time()
-                if self.protocol != 'ros2':
+                # Send heartbeat if nothing else has been exchanged for a second
+                if send_heartbeats:
+                    current_time = time.monotonic()
                     if current_time - self.last_heartbeat > 1.0:
                         await self._send_heartbeat()
                         self.last_heartbeat = current_time
                 
-                await asyncio.sleep(0.02)  # 50 Hz command rate
+                # Wait for fresh data instead of polling for it; fall back to the idle tick
+                elapsed = loop.time() - tick_start
+                if elapsed < _STATE_MIN_PERIOD:
+                    await asyncio.sleep(_STATE_MIN_PERIOD - elapsed)
+                try:
+                    timeout = max(0.0, tick_start + _STATE_IDLE_PERIOD - loop.time())
+                    await asyncio.wait_for(state_updated.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                state_updated.clear()
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.logger.error(f"Command loop error: {e}")
+                self.logger.error(f"Monitoring loop error: {e}")
                 await asyncio.sleep(1.0)
     
+    def _log_callback_errors(self, kind: str, results):
+        """Log the exceptions returned by asyncio.gather(..., return_exceptions=True)"""
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"{kind} callback failed: {result}")
+    
     async def _update_robot_state(self):
         """Update robot state from sensor data"""
         current_time = time.time()
         has_real_data = False
         
         if self.protocol == 'ros2' and self.ros2_client:
-            # Pull snapshot from ROS 2 client
-            st = self.ros2_client.state
+            # Pull snapshot from ROS 2 client (one immutable tuple, swapped atomically by the spin thread)
+            battery, temperature, position, orientation, last_update_ts = self.ros2_client.state
             
             # Check if we have real data from ROS2
-            if st.last_update_ts and (current_time - st.last_update_ts) < 5.0:
+            if last_update_ts and (current_time - last_update_ts) < 5.0:
                 # We have recent real data
                 has_real_data = True
-                self.robot_state.last_update = st.last_update_ts
-                self.robot_state.is_connected = True
-                if st.battery_percentage is not None:
-                    self.robot_state.battery_level = st.battery_percentage
-                if st.temperature_c is not None:
-                    self.robot_state.temperature = st.temperature_c
-                if st.position_xyz is not None:
-                    self.robot_state.position = st.position_xyz
-                if st.orientation_rpy is not None:
-                    self.robot_state.orientation = st.orientation_rpy
+                state = self.robot_state
+                state.last_update = last_update_ts
+                state.is_connected = True
+                if battery is not None:
+                    state.battery_level = battery
+                if temperature is not None:
+                    state.temperature = temperature
+                if position is not None:
+                    state.position = position
+                if orientation is not None:
+                    state.orientation = orientation
+        elif self.transport:
+            # UDP telemetry is written into robot_state by _parse_state as it arrives
+            if self.robot_state.is_connected and (current_time - self.robot_state.last_update) < 5.0:
+                has_real_data = True
         elif self.protocol == 'webrtc' and self.webrtc_client:
             # Check if we have recent WebRTC data
             if self.robot_state.last_update and (current_time - self.robot_state.last_update) < 5.0:
                 has_real_data = True
-                # WebRTC data is already updated via callbacks
-                if st.orientation_rpy is not None:
-                    self.robot_state.orientation = st.orientation_rpy
+                # WebRTC data (orientation included) is already updated via callbacks
         
-        if not has_real_data:
+        if not has_real_data and not self._sim_enabled:
+            # Simulation disabled: keep the last real readings (and their timestamp) untouched
+            self.robot_state.is_connected = False
+        elif not has_real_data:
             # Simulate realistic state updates when no real robot data
-            self.robot_state.last_update = current_time
-            self.robot_state.is_connected = False  # Mark as simulation mode
+            state = self.robot_state
+            sin, cos = math.sin, math.cos
+            t = time.monotonic()  # simulation phase; last_update stays wall-clock
+            state.last_update = current_time
+            state.is_connected = False  # Mark as simulation mode
             
             # Simulate realistic battery level (85-95% range with slow drain)
-            if not hasattr(self, '_sim_battery_base'):
-                self._sim_battery_base = 90.0
-                self._sim_start_time = current_time
-            
             # Battery drains very slowly over time
-            elapsed_hours = (current_time - self._sim_start_time) / 3600.0
-            self.robot_state.battery_level = max(20.0, self._sim_battery_base - (elapsed_hours * 2.0))
+            elapsed_hours = (t - self._sim_start_time) * _INV_HOUR
+            state.battery_level = max(20.0, self._sim_battery_base - (elapsed_hours * 2.0))
             
             # Simulate realistic temperature (30-40°C with variation)
-            self.robot_state.temperature = 35.0 + 5.0 * (0.5 + 0.5 * math.sin(current_time * 0.1))
-            
-            # Simulate position with slight movement
-            base_x, base_y = 0.0, 0.0
-            if not hasattr(self, '_sim_position_base'):
-                self._sim_position_base = (base_x, base_y)
+            state.temperature = 35.0 + 5.0 * (0.5 + 0.5 * sin(t * 0.1))
             
-            # Small random-ish movement
-            offset_x = 0.1 * math.sin(current_time * 0.05)
-            offset_y = 0.1 * math.cos(current_time * 0.03)
-            self.robot_state.position = (
-                self._sim_position_base[0] + offset_x,
-                self._sim_position_base[1] + offset_y,
+            # Simulate position with slight, random-ish movement
+            base_x, base_y = self._sim_position_base
+            state.position = (
+                base_x + 0.1 * sin(t * 0.05),
+                base_y + 0.1 * cos(t * 0.03),
                 0.3  # Height above ground
             )
             
             # Simulate orientation with slight rotation
-            yaw_variation = 0.05 * math.sin(current_time * 0.02)
-            self.robot_state.orientation = (0.0, 0.0, yaw_variation)
+            state.orientation = (0.0, 0.0, 0.05 * sin(t * 0.02))
+    
+    def _parse_state(self, data: bytes):
+        """Decode a telemetry packet straight into robot_state without per-field unpacking"""
+        try:
+            packet = np.frombuffer(data, dtype=STATE_PACKET_DTYPE, count=1)[0]
+            state = self.robot_state
+            try:
+                state.mode = RobotMode(int(packet['mode']))
+            except ValueError:
+                state.mode = RobotMode.IDLE
+            state.battery_level = float(packet['battery'])
+            state.temperature = float(packet['temperature'])
+            state.position = tuple(packet['position'].tolist())
+            state.orientation = tuple(packet['orientation'].tolist())
+            state.velocity = tuple(packet['velocity'].tolist())
+            state.joint_positions[:] = packet['joints']
+            self._have_joint_data = True
+            state.is_connected = True
+            state.last_update = time.time()
+            self.last_heartbeat = time.monotonic()
+            self._state_updated.set()
+        except Exception as e:
+            self.logger.error(f"Error parsing UDP telemetry: {e}")
     
     async def _send_heartbeat(self):
         """Send heartbeat to robot"""
         try:
-            heartbeat_packet = b'\xFF\xFE\xFD\xFC'  # Heartbeat signature
-            if not self.socket:
-                self.logger.error("UDP socket not initialized; cannot send heartbeat")
+            if not self._can_transmit():
+                return
+            if not self.transport:
+                self.logger.error("UDP transport not initialized; cannot send heartbeat")
                 return
-            self.socket.sendto(heartbeat_packet, (self.robot_ip, self.udp_port))
+            self._tx_queue.put_nowait(_HEARTBEAT)
         except Exception as e:
             self.logger.error(f"Failed to send heartbeat: {e}")
     
@@ -617,69 +940,88 @@ class RobotManager:
         self.emergency_stop = False
         # Additional safety initialization
     
+    def _joint_limit_arrays(self):
+        """Expand the per-joint-type limits from the control config to one entry per joint"""
+        joints_config = self.config.get('control', {}).get('joints', {})
+        # Joint order per leg: hip, thigh, calf (x4 legs)
+        lower = [joints_config.get('hip_min', -0.8), joints_config.get('thigh_min', -3.0),
+                 joints_config.get('calf_min', -2.7)]
+        upper = [joints_config.get('hip_max', 0.8), joints_config.get('thigh_max', 3.0),
+                 joints_config.get('calf_max', -0.5)]
+        legs = NUM_JOINTS // 3
+        return (np.tile(np.asarray(lower, dtype=np.float32), legs),
+                np.tile(np.asarray(upper, dtype=np.float32), legs))
+    
+    def _build_packet_cache(self):
+        """Prebuild the all-zero stop command (mode packets live in _MODE_PACKETS)"""
+        self._stop_packet = bytes(self._create_motion_packet(MotionCommand()))
+    
+    def _motion_limit(self, key: str, default: float) -> float:
+        """Read a configured speed limit, capped to what the motion packet can encode"""
+        limit = float(self.robot_config.get(key, default))
+        if limit > _MOTION_LIMIT:
+            self.logger.warning(f"robot.{key}={limit} exceeds the motion packet range; using {_MOTION_LIMIT}")
+            limit = _MOTION_LIMIT
+        return limit
+    
     def _validate_motion_command(self, command: MotionCommand) -> bool:
         """Validate motion command parameters"""
-        max_linear = self.robot_config.get('max_speed', 1.5)
-        max_angular = self.robot_config.get('max_angular_speed', 2.0)
-        
-        if abs(command.linear_x) > max_linear:
-            return False
-        if abs(command.linear_y) > max_linear:
-            return False
-        if abs(command.angular_z) > max_angular:
-            return False
-            
-        return True
+        # Chained comparisons also reject NaN, which abs() > limit let through
+        max_linear = self._max_linear
+        max_angular = self._max_angular
+        return (-max_linear <= command.linear_x <= max_linear
+                and -max_linear <= command.linear_y <= max_linear
+                and -max_angular <= command.angular_z <= max_angular
+                and 0.0 <= command.step_height <= _MOTION_LIMIT)
     
-    def _create_motion_packet(self, command: MotionCommand) -> bytes:
+    def _create_motion_packet(self, command: MotionCommand) -> memoryview:
         """Create motion command packet"""
         # MOCK MODE: This creates placeholder packets that real robots ignore
         # Real Unitree Go2 robots require DDS messages with specific formats
-        self.logger.debug(f"MOCK MODE: Creating motion packet - robot will ignore this")
-        self.logger.debug(f"Motion command: linear_x={command.linear_x}, linear_y={command.linear_y}, angular_z={command.angular_z}")
+        # (logged once on connect rather than per packet)
         
         # Create a simple packet structure (mock - replace with actual protocol)
-        packet = struct.pack(
-            'ffff',
-            command.linear_x,
-            command.linear_y,
-            command.angular_z,
-            command.step_height
+        _MOTION_STRUCT.pack_into(
+            self._motion_buf, 0,
+            _MOTION_VERSION,
+            round(command.linear_x * _MOTION_SCALE),
+            round(command.linear_y * _MOTION_SCALE),
+            round(command.angular_z * _MOTION_SCALE),
+            round(command.step_height * _MOTION_SCALE)
         )
-        return packet
+        return self._motion_mv
     
     def _create_mode_packet(self, mode: RobotMode) -> bytes:
         """Create mode change command packet"""
         # MOCK MODE: This creates placeholder packets that real robots ignore
         # Real Unitree Go2 robots require DDS SportClient commands
-        self.logger.debug(f"MOCK MODE: Creating mode packet for {mode.name} - robot will ignore this")
-        
-        # Create a mode command packet (mock - replace with actual Unitree protocol)
-        # Format: [header][command_type][mode][checksum]
-        header = b'\xAA\xBB'  # Command header
-        command_type = b'\x01'  # Mode change command
-        mode_byte = struct.pack('B', mode.value)
-        checksum = struct.pack('B', (sum(header + command_type + mode_byte)) % 256)
+        self.logger.debug("MOCK MODE: Creating mode packet for %s - robot will ignore this", mode.name)
         
-        packet = header + command_type + mode_byte + checksum
-        return packet
+        # Mock packet (replace with actual Unitree protocol), prebuilt per mode
+        return _MODE_PACKETS[mode]
     
     def _check_safety_conditions(self):
         """Check safety conditions and trigger emergency stop if needed"""
-        safety_config = self.safety_config.get('boundaries', {})
+        state = self.robot_state
         
         # Only check safety conditions if we have recent robot data
-        if self.robot_state.last_update == 0.0:
+        if state.last_update == 0.0:
             return
         
         # Check battery level (warn for both real and simulated data)
-        min_battery = safety_config.get('min_battery_level', 20)
-        if self.robot_state.battery_level < min_battery:
-            status = "simulated" if not self.robot_state.is_connected else "real"
-            self.logger.warning(f"Low battery ({status}): {self.robot_state.battery_level:.1f}%")
+        if state.battery_level < self._min_battery:
+            status = "simulated" if not state.is_connected else "real"
+            self.logger.warning(f"Low battery ({status}): {state.battery_level:.1f}%")
         
         # Check temperature
-        max_temp = safety_config.get('max_temperature', 65)
-        if self.robot_state.temperature > max_temp:
-            status = "simulated" if not self.robot_state.is_connected else "real"
-            self.logger.warning(f"High temperature ({status}): {self.robot_state.temperature:.1f}°C")
+        if state.temperature > self._max_temp:
+            status = "simulated" if not state.is_connected else "real"
+            self.logger.warning(f"High temperature ({status}): {state.temperature:.1f}°C")
+        
+        # Check joint limits (real joint data only; until it arrives the joints read zero,
+        # which is outside the calf range)
+        if state.is_connected and self._have_joint_data:
+            within = joints_within_limits(state.joint_positions, self._joint_min, self._joint_max)
+            if not within and not self._joint_limits_exceeded:
+                self.logger.warning("Joint positions outside configured limits")
+            self._joint_limits_exceeded = not within
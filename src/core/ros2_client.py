@@ -15,17 +15,22 @@ We import them lazily and degrade gracefully if not found.
 
 from __future__ import annotations
 
+import importlib
+import os
+import struct
 import threading
 import time
-from dataclasses import dataclass, field
-import importlib
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, NamedTuple, Optional
 
+from core._kernels import quat_to_rpy
 from utils.logger import get_logger
 
+_time = time.time  # bound once; called on every subscriber message
+
+
+class ROS2ClientState(NamedTuple):
+    """Immutable snapshot; subscribers swap in a new one, so readers never see a partial update."""
 
-@dataclass
-class ROS2ClientState:
     battery_percentage: Optional[float] = None
     temperature_c: Optional[float] = None
     position_xyz: Optional[tuple[float, float, float]] = None
@@ -33,6 +38,47 @@ class ROS2ClientState:
     last_update_ts: float = 0.0
 
 
+# Raw (serialized) subscriptions carry plain little-endian CDR: a 4-byte encapsulation header
+# (0x00 0x01 ...) followed by the payload; alignment is relative to the payload start
+_CDR_PAYLOAD = 4
+_CDR_U32 = struct.Struct('<I')
+_CDR_F32 = struct.Struct('<f')
+_CDR_F64 = struct.Struct('<d')
+_CDR_POSE = struct.Struct('<7d')  # position x, y, z; orientation x, y, z, w
+
+
+def _cdr_align(offset: int, size: int) -> int:
+    return offset + (-(offset - _CDR_PAYLOAD) % size)
+
+
+def _cdr_skip_string(buf: bytes, offset: int) -> int:
+    """Return the offset just past a CDR string (uint32 length incl. NUL, then the bytes)."""
+    offset = _cdr_align(offset, 4)
+    return offset + 4 + _CDR_U32.unpack_from(buf, offset)[0]
+
+
+def _cdr_skip_header(buf: bytes) -> int:
+    """Return the offset just past a leading std_msgs/Header (int32 sec, uint32 nanosec, frame_id)."""
+    if buf[1] != 0x01:
+        raise ValueError("only little-endian CDR is supported")
+    return _cdr_skip_string(buf, _CDR_PAYLOAD + 8)
+
+
+def _cdr_battery_percentage(buf: bytes) -> float:
+    # BatteryState: header; float32 voltage, temperature, current, charge, capacity, design_capacity, percentage
+    return _CDR_F32.unpack_from(buf, _cdr_align(_cdr_skip_header(buf), 4) + 6 * 4)[0]
+
+
+def _cdr_temperature(buf: bytes) -> float:
+    # Temperature: header; float64 temperature, variance
+    return _CDR_F64.unpack_from(buf, _cdr_align(_cdr_skip_header(buf), 8))[0]
+
+
+def _cdr_odom_pose(buf: bytes) -> tuple[float, ...]:
+    # Odometry: header; child_frame_id; pose.pose.position, pose.pose.orientation (float64)
+    return _CDR_POSE.unpack_from(buf, _cdr_align(_cdr_skip_string(buf, _cdr_skip_header(buf)), 8))
+
+
 class ROS2Client:
     """Encapsulates rclpy node, pubs/subs, and a spin thread."""
 
@@ -44,17 +90,26 @@ class ROS2Client:
         self._node = None
         self._executor = None
         self._spin_thread: Optional[threading.Thread] = None
-        self._stop_event = threading.Event()
 
-        # Shared state with lightweight lock
+        # Shared state snapshot, published by reference assignment (atomic under the GIL).
+        # Only the single-threaded executor writes it, so no lock is needed on either side.
         self.state = ROS2ClientState()
-        self._lock = threading.Lock()
+        self._update_callback: Optional[Callable[[], None]] = None
 
         # Handles
         self._pub_cmd_vel = None
         self._svc_stand = None
         self._svc_sit = None
 
+        # Message objects/types resolved once in initialize(); the Twist is reused for every publish
+        self._twist_msg = None
+        self._trigger_request_cls = None
+
+        # cmd_vel mailbox: publish_twist() stores the newest (x, y, yaw) tuple, a timer publishes it
+        self._cmd_vel_timer = None
+        self._pending_twist: Optional[tuple[float, float, float]] = None
+        self._sent_twist: Optional[tuple[float, float, float]] = None
+
         # Configurable topic/service names
         comm_cfg = self.config.get("communication", {})
         ros2_cfg = comm_cfg.get("ros2", {})
@@ -73,6 +128,11 @@ class ROS2Client:
         self.topic_odom = ns_join(ros2_cfg.get("odom_topic", "odom"))
         self.service_stand = ns_join(ros2_cfg.get("stand_service", "stand_up"))
         self.service_sit = ns_join(ros2_cfg.get("sit_service", "sit_down"))
+        self.dds_profile = ros2_cfg.get("dds_profile", "")
+        # cmd_vel publish rate in Hz; 0 publishes every command immediately
+        self.cmd_vel_rate = float(ros2_cfg.get("cmd_vel_rate", comm_cfg.get("command_frequency", 50)))
+        # Receive status topics serialized and read only the needed fields (skips full deserialization)
+        self.raw_subscriptions = bool(ros2_cfg.get("raw_subscriptions", False))
 
     # ----- Lifecycle -----
     def initialize(self) -> bool:
@@ -90,10 +150,16 @@ class ROS2Client:
                 return False
 
             # Extract classes
-            MultiThreadedExecutor = getattr(rclpy_exec_mod, 'MultiThreadedExecutor')
+            SingleThreadedExecutor = getattr(rclpy_exec_mod, 'SingleThreadedExecutor')
             Twist = getattr(geom_msgs_mod, 'Twist')
             BatteryState = getattr(sensor_msgs_mod, 'BatteryState')
 
+            # Fast DDS reads its XML profile when the context is created, so export it before init;
+            # an explicitly exported FASTRTPS_DEFAULT_PROFILES_FILE wins
+            if self.dds_profile and "FASTRTPS_DEFAULT_PROFILES_FILE" not in os.environ:
+                os.environ["FASTRTPS_DEFAULT_PROFILES_FILE"] = os.path.abspath(self.dds_profile)
+                self.logger.info(f"Using Fast DDS profile {self.dds_profile}")
+
             self._rclpy = rclpy
             self._rclpy.init(args=None)
 
@@ -102,14 +168,22 @@ class ROS2Client:
 
             # Publishers
             self._pub_cmd_vel = self._node.create_publisher(Twist, self.topic_cmd_vel, 10)
+            self._twist_msg = Twist()  # all fields start at 0.0; only x/y/yaw rates change
+            if self.cmd_vel_rate > 0:
+                self._cmd_vel_timer = self._node.create_timer(1.0 / self.cmd_vel_rate, self._publish_latest_twist)
 
             # Subscribers (optional; will simply be quiet if no publishers present)
-            self._node.create_subscription(BatteryState, self.topic_battery, self._on_battery, 10)
+            raw = self.raw_subscriptions
+            self._node.create_subscription(
+                BatteryState, self.topic_battery,
+                self._on_battery_raw if raw else self._on_battery, 10, raw=raw)
 
             # Try to subscribe to temperature if message type exists
             try:
                 Temperature = getattr(sensor_msgs_mod, 'Temperature')
-                self._node.create_subscription(Temperature, self.topic_temperature, self._on_temperature, 10)
+                self._node.create_subscription(
+                    Temperature, self.topic_temperature,
+                    self._on_temperature_raw if raw else self._on_temperature, 10, raw=raw)
             except Exception:
                 # Sensor message may not exist or topic not provided
                 pass
@@ -118,7 +192,8 @@ class ROS2Client:
             try:
                 nav_msgs_mod = importlib.import_module('nav_msgs.msg')
                 Odometry = getattr(nav_msgs_mod, 'Odometry')
-                self._node.create_subscription(Odometry, self.topic_odom, self._on_odom, 10)
+                self._node.create_subscription(
+                    Odometry, self.topic_odom, self._on_odom_raw if raw else self._on_odom, 10, raw=raw)
             except Exception:
                 pass
 
@@ -128,12 +203,13 @@ class ROS2Client:
                 Trigger = getattr(std_srvs_mod, 'Trigger')
                 self._svc_stand = self._node.create_client(Trigger, self.service_stand)
                 self._svc_sit = self._node.create_client(Trigger, self.service_sit)
+                self._trigger_request_cls = Trigger.Request
             except Exception:
                 self._svc_stand = None
                 self._svc_sit = None
 
-            # Start executor thread
-            self._executor = MultiThreadedExecutor()
+            # Start executor thread (callbacks are short state updates; one thread is plenty)
+            self._executor = SingleThreadedExecutor()
             self._executor.add_node(self._node)
             self._spin_thread = threading.Thread(target=self._spin_loop, name="ros2-spin", daemon=True)
             self._spin_thread.start()
@@ -148,16 +224,20 @@ class ROS2Client:
 
     def shutdown(self):
         try:
-            self._stop_event.set()
             if self._executor is not None:
-                # remove node first
+                # Shutting the executor down makes the blocking spin() return
                 try:
-                    if self._node:
-                        self._executor.remove_node(self._node)
+                    self._executor.shutdown()
                 except Exception:
                     pass
             if self._spin_thread and self._spin_thread.is_alive():
                 self._spin_thread.join(timeout=2.0)
+            if self._executor is not None:
+                try:
+                    if self._node:
+                        self._executor.remove_node(self._node)
+                except Exception:
+                    pass
             if self._node is not None:
                 try:
                     self._node.destroy_node()
@@ -171,133 +251,153 @@ class ROS2Client:
         except Exception as e:
             self.logger.error(f"Error shutting down ROS 2 client: {e}")
 
+    def set_update_callback(self, callback: Optional[Callable[[], None]]):
+        """Register a callable invoked after each state update (runs on the spin thread)."""
+        self._update_callback = callback
+
+    def _notify_update(self):
+        callback = self._update_callback
+        if callback is not None:
+            callback()
+
     # ----- Spin thread -----
     def _spin_loop(self):
         try:
-            while not self._stop_event.is_set():
-                # Non-blocking spin some time slice
-                if self._executor:
-                    self._executor.spin_once(timeout_sec=0.1)
+            # Blocks dispatching callbacks until shutdown() shuts the executor down
+            self._executor.spin()
         except Exception as e:
             self.logger.error(f"ROS 2 spin loop error: {e}")
 
     # ----- Publishers -----
     def publish_twist(self, linear_x: float, linear_y: float, angular_z: float):
+        if self._cmd_vel_timer is not None:
+            # Latest command wins; the cmd_vel timer publishes it on the executor thread
+            self._pending_twist = (float(linear_x), float(linear_y), float(angular_z))
+            return
+        self._send_twist(linear_x, linear_y, angular_z)
+
+    def publish_stop(self):
+        """Publish a zero Twist immediately instead of waiting for the next cmd_vel tick."""
+        # A fresh stop tuple also makes the timer publish zeros once more, in case it had already
+        # picked up an older command when this runs
+        self._pending_twist = (0.0, 0.0, 0.0)
+        if self._pub_cmd_vel is None:
+            return
         try:
-            geom_msgs_mod = importlib.import_module('geometry_msgs.msg')
-            Twist = getattr(geom_msgs_mod, 'Twist')
-            msg = Twist()  # type: ignore[call-arg]
+            # New message: the timer may be filling the shared _twist_msg on the executor thread
+            self._pub_cmd_vel.publish(type(self._twist_msg)())
+        except Exception as e:
+            self.logger.error(f"Failed to publish stop Twist: {e}")
+
+    def _publish_latest_twist(self):
+        pending = self._pending_twist
+        if pending is self._sent_twist:
+            return  # no new command since the last tick (each command is a fresh tuple)
+        self._sent_twist = pending
+        self._send_twist(*pending)
+
+    def _send_twist(self, linear_x: float, linear_y: float, angular_z: float):
+        msg = self._twist_msg
+        if msg is None or not self._pub_cmd_vel:
+            return
+        try:
+            # publish() serializes synchronously, so the same message can be refilled each call
             msg.linear.x = float(linear_x)
             msg.linear.y = float(linear_y)
-            msg.linear.z = 0.0
-            msg.angular.x = 0.0
-            msg.angular.y = 0.0
             msg.angular.z = float(angular_z)
-            if self._pub_cmd_vel:
-                self._pub_cmd_vel.publish(msg)
+            self._pub_cmd_vel.publish(msg)
         except Exception as e:
             self.logger.error(f"Failed to publish Twist: {e}")
 
     # ----- Services -----
     def call_stand(self, timeout_sec: float = 2.0) -> bool:
-        if not self._svc_stand:
-            self.logger.warning("Stand service client not available")
-            return False
-        try:
-            # Ensure module is present (mostly for environments without ROS 2)
-            importlib.import_module('std_srvs.srv')
-            if not self._svc_stand.wait_for_service(timeout_sec=timeout_sec):
-                self.logger.warning("Stand service not available")
-                return False
-            req = type(self._svc_stand.srv_type.Request)()  # type: ignore[attr-defined]
-            future = self._svc_stand.call_async(req)
-            start = time.time()
-            while time.time() - start < timeout_sec:
-                if future.done():
-                    result = future.result()
-                    return bool(getattr(result, "success", False))
-                time.sleep(0.05)
-            self.logger.warning("Stand service call timed out")
-            return False
-        except Exception as e:
-            self.logger.error(f"Stand service call failed: {e}")
-            return False
+        return self._call_trigger(self._svc_stand, "Stand", timeout_sec)
 
     def call_sit(self, timeout_sec: float = 2.0) -> bool:
-        if not self._svc_sit:
-            self.logger.warning("Sit service client not available")
+        return self._call_trigger(self._svc_sit, "Sit", timeout_sec)
+
+    def _call_trigger(self, client, name: str, timeout_sec: float) -> bool:
+        """Call a std_srvs/Trigger service and block until the executor delivers the response."""
+        if not client:
+            self.logger.warning(f"{name} service client not available")
             return False
         try:
-            importlib.import_module('std_srvs.srv')
-            if not self._svc_sit.wait_for_service(timeout_sec=timeout_sec):
-                self.logger.warning("Sit service not available")
+            if not client.wait_for_service(timeout_sec=timeout_sec):
+                self.logger.warning(f"{name} service not available")
                 return False
-            req = type(self._svc_sit.srv_type.Request)()  # type: ignore[attr-defined]
-            future = self._svc_sit.call_async(req)
-            start = time.time()
-            while time.time() - start < timeout_sec:
-                if future.done():
-                    result = future.result()
-                    return bool(getattr(result, "success", False))
-                time.sleep(0.05)
-            self.logger.warning("Sit service call timed out")
+            future = client.call_async(self._trigger_request_cls())
+            # The spin thread completes the future; wake as soon as it does instead of polling
+            done = threading.Event()
+            future.add_done_callback(lambda _future: done.set())
+            if done.wait(timeout_sec):
+                return bool(getattr(future.result(), "success", False))
+            self.logger.warning(f"{name} service call timed out")
             return False
         except Exception as e:
-            self.logger.error(f"Sit service call failed: {e}")
+            self.logger.error(f"{name} service call failed: {e}")
             return False
 
     # ----- Subscribers -----
+    # Typed subscribers read fields directly: rosidl messages always carry them as floats.
+    # Every callback still guards the update, since an exception escaping into the executor
+    # (e.g. notifying a closed event loop during shutdown) would end the spin thread for good.
+
     def _on_battery(self, msg):
         try:
-            with self._lock:
-                # BatteryState.percentage: 0.0..1.0
-                perc = float(getattr(msg, "percentage", 0.0))
-                self.state.battery_percentage = max(0.0, min(100.0, perc * 100.0))
-                self.state.last_update_ts = time.time()
+            self._set_battery(msg.percentage)
+        except Exception:
+            pass
+
+    def _on_battery_raw(self, data: bytes):
+        try:
+            self._set_battery(_cdr_battery_percentage(data))
         except Exception:
             pass
 
+    def _set_battery(self, perc: float):
+        # BatteryState.percentage: 0.0..1.0
+        battery = max(0.0, min(100.0, perc * 100.0))
+        self.state = self.state._replace(battery_percentage=battery, last_update_ts=_time())
+        self._notify_update()
+
     def _on_temperature(self, msg):
         try:
             # sensor_msgs/Temperature has .temperature in Celsius
-            temp_c = float(getattr(msg, "temperature", 0.0))
-            with self._lock:
-                self.state.temperature_c = temp_c
-                self.state.last_update_ts = time.time()
+            self._set_temperature(msg.temperature)
+        except Exception:
+            pass
+
+    def _on_temperature_raw(self, data: bytes):
+        try:
+            self._set_temperature(_cdr_temperature(data))
         except Exception:
             pass
 
+    def _set_temperature(self, temp_c: float):
+        self.state = self.state._replace(temperature_c=temp_c, last_update_ts=_time())
+        self._notify_update()
+
     def _on_odom(self, msg):
         try:
             # nav_msgs/Odometry: pose.pose.position and orientation (quat)
-            pos = msg.pose.pose.position
-            ox, oy, oz, ow = (
-                msg.pose.pose.orientation.x,
-                msg.pose.pose.orientation.y,
-                msg.pose.pose.orientation.z,
-                msg.pose.pose.orientation.w,
-            )
-
-            # Convert quaternion to roll/pitch/yaw
-            import math
-
-            sinr_cosp = 2 * (ow * ox + oy * oz)
-            cosr_cosp = 1 - 2 * (ox * ox + oy * oy)
-            roll = math.atan2(sinr_cosp, cosr_cosp)
-
-            sinp = 2 * (ow * oy - oz * ox)
-            if abs(sinp) >= 1:
-                pitch = math.copysign(math.pi / 2, sinp)
-            else:
-                pitch = math.asin(sinp)
-
-            siny_cosp = 2 * (ow * oz + ox * oy)
-            cosy_cosp = 1 - 2 * (oy * oy + oz * oz)
-            yaw = math.atan2(siny_cosp, cosy_cosp)
-
-            with self._lock:
-                self.state.position_xyz = (float(pos.x), float(pos.y), float(pos.z))
-                self.state.orientation_rpy = (roll, pitch, yaw)
-                self.state.last_update_ts = time.time()
+            pose = msg.pose.pose
+            pos = pose.position
+            o = pose.orientation
+            self._set_pose((pos.x, pos.y, pos.z), quat_to_rpy(o.x, o.y, o.z, o.w))
         except Exception:
             pass
+
+    def _on_odom_raw(self, data: bytes):
+        try:
+            x, y, z, ox, oy, oz, ow = _cdr_odom_pose(data)
+            self._set_pose((x, y, z), quat_to_rpy(ox, oy, oz, ow))
+        except Exception:
+            pass
+
+    def _set_pose(self, position: tuple[float, float, float], orientation: tuple[float, float, float]):
+        self.state = self.state._replace(
+            position_xyz=position,
+            orientation_rpy=orientation,
+            last_update_ts=_time(),
+        )
+        self._notify_update()
@@ -5,10 +5,56 @@ Enhanced WebRTC communication with proper Unitree protocol support
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, Callable
+import time
+from typing import Dict, Any, NamedTuple, Optional, Callable
+
+import numpy as np
 from go2_webrtc_driver.webrtc_driver import Go2WebRTCConnection, WebRTCConnectionMethod
 from go2_webrtc_driver.constants import RTC_TOPIC, SPORT_CMD
 
+NUM_MOTORS = 12  # leg motors reported in low state (hip, thigh, calf x 4)
+
+# All motor fields live in one contiguous record, so the whole table can be shared as a single buffer
+MOTOR_STATE_DTYPE = np.dtype([
+    ('position', '<f4', NUM_MOTORS),
+    ('velocity', '<f4', NUM_MOTORS),
+    ('torque', '<f4', NUM_MOTORS),
+    ('temperature', '<f4', NUM_MOTORS),
+    ('lost', '?', NUM_MOTORS),
+])
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Return a read-only view; the owner keeps writing through the original array"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _fill(array: np.ndarray, values) -> None:
+    """Copy values into the front of a fixed-size array; a short list leaves the tail unchanged"""
+    n = min(len(values), len(array))
+    array[:n] = values[:n]
+
+
+class SensorSnapshot(NamedTuple):
+    """Latest robot readings. Handlers swap in a new snapshot instead of mutating this one,
+    so every callback can be handed the same instance without copying.
+    (The NumPy arrays are the exception: motors, foot force and the IMU vectors are filled in place.)"""
+    battery: Dict[str, float]
+    imu: Dict[str, Any]
+    motors: Dict[str, np.ndarray]
+    motor_count: int = 0
+    position: Dict[str, float] = {'x': 0, 'y': 0, 'z': 0}
+    velocity: Dict[str, float] = {'x': 0, 'y': 0, 'z': 0}
+    foot_force: Any = None
+    body_height: float = 0
+    mode: int = 0
+    gait_type: int = 0
+    foot_raise_height: float = 0
+    connected: bool = False
+    ts: float = 0.0  # time.monotonic() of the last robot message, for staleness checks
+
 class UnitreeWebRTCClient:
     """Enhanced WebRTC client for Unitree Go2 robot using official SDK"""
     
@@ -21,25 +67,39 @@ class UnitreeWebRTCClient:
         self.robot_ip = self.robot_config.get('ip_address', '192.168.100.94')
         self.connection = None
         
-        # Data storage for latest sensor readings
-        self.latest_data = {
-            'battery': {'level': 0, 'voltage': 0, 'current': 0, 'temperature': 0},
-            'imu': {'roll': 0, 'pitch': 0, 'yaw': 0, 'gyroscope': [0, 0, 0], 'accelerometer': [0, 0, 0]},
-            'motors': [],
-            'position': {'x': 0, 'y': 0, 'z': 0},
-            'velocity': {'x': 0, 'y': 0, 'z': 0},
-            'foot_force': [0, 0, 0, 0],
-            'body_height': 0,
-            'mode': 0,
-            'connected': False
-        }
+        # Motor state as one preallocated array per field (views into a single record),
+        # filled in place on every low state frame
+        self._motor_table = np.zeros((), dtype=MOTOR_STATE_DTYPE)
+        self.motors = {name: self._motor_table[name] for name in MOTOR_STATE_DTYPE.names}
         
-        # Data callbacks for real-time updates
-        self.data_callbacks = []
+        # Fixed-size vectors, also filled in place; snapshots hold read-only views of them
+        self._foot_force = np.zeros(4, dtype=np.int16)
+        self._gyroscope = np.zeros(3, dtype=np.float32)
+        self._accelerometer = np.zeros(3, dtype=np.float32)
+        
+        # Latest sensor readings (replaced as a whole on every update)
+        self.snapshot = SensorSnapshot(
+            battery={'level': 0, 'voltage': 0, 'current': 0, 'temperature': 0},
+            imu={'roll': 0, 'pitch': 0, 'yaw': 0,
+                 'gyroscope': _readonly(self._gyroscope), 'accelerometer': _readonly(self._accelerometer)},
+            motors=self.motors,
+            foot_force=_readonly(self._foot_force),
+        )
+        
+        # Data callbacks for real-time updates, run by a dispatcher task so decoding never waits on them.
+        # Keyed by the callback for O(1) add/remove; dispatch iterates an immutable tuple rebuilt on change.
+        self._callbacks: Dict[Callable, None] = {}
+        self.data_callbacks = ()
+        self._data_ready = asyncio.Event()
+        self._dispatch_task = None
         
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
+        # Resolved once for the teleop hot path (move_robot)
+        self._sport_topic = RTC_TOPIC['SPORT_MOD']
+        self._move_cmd_id = SPORT_CMD['Move']
+        
     async def connect(self) -> bool:
         """Connect to Unitree robot using WebRTC"""
         try:
@@ -69,14 +129,16 @@ class UnitreeWebRTCClient:
             
             # Subscribe to various data topics
             self._setup_subscriptions()
+            if self._dispatch_task is None:
+                self._dispatch_task = asyncio.create_task(self._dispatch_callbacks())
             
-            self.latest_data['connected'] = True
+            self.snapshot = self.snapshot._replace(connected=True)
             self.logger.info("Successfully connected to Unitree robot")
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to connect to robot: {e}")
-            self.latest_data['connected'] = False
+            self.snapshot = self.snapshot._replace(connected=False)
             return False
     
     def _setup_subscriptions(self):
@@ -106,52 +168,56 @@ class UnitreeWebRTCClient:
         """Handle low-level state data (motors, IMU, battery)"""
         try:
             data = message['data']
+            snapshot = self.snapshot
+            changes = {}
             
             # Update IMU data
             if 'imu_state' in data:
-                imu = data['imu_state']
-                if 'rpy' in imu and len(imu['rpy']) >= 3:
-                    self.latest_data['imu']['roll'] = imu['rpy'][0]
-                    self.latest_data['imu']['pitch'] = imu['rpy'][1]
-                    self.latest_data['imu']['yaw'] = imu['rpy'][2]
-                if 'gyroscope' in imu:
-                    self.latest_data['imu']['gyroscope'] = imu['gyroscope']
-                if 'accelerometer' in imu:
-                    self.latest_data['imu']['accelerometer'] = imu['accelerometer']
-                if 'temperature' in imu:
-                    self.latest_data['imu']['temperature'] = imu['temperature']
+                imu_state = data['imu_state']
+                if 'gyroscope' in imu_state:
+                    _fill(self._gyroscope, imu_state['gyroscope'])
+                if 'accelerometer' in imu_state:
+                    _fill(self._accelerometer, imu_state['accelerometer'])
+                imu = dict(snapshot.imu)
+                if 'rpy' in imu_state and len(imu_state['rpy']) >= 3:
+                    imu['roll'], imu['pitch'], imu['yaw'] = imu_state['rpy'][:3]
+                if 'temperature' in imu_state:
+                    imu['temperature'] = imu_state['temperature']
+                changes['imu'] = imu
             
-            # Update motor data
+            # Update motor data (index = motor id)
             if 'motor_state' in data:
-                motors = []
-                for i, motor in enumerate(data['motor_state']):
-                    motors.append({
-                        'id': i,
-                        'position': motor.get('q', 0),
-                        'velocity': motor.get('dq', 0),
-                        'torque': motor.get('tau_est', 0),
-                        'temperature': motor.get('temperature', 0),
-                        'lost': motor.get('lost', False)
-                    })
-                self.latest_data['motors'] = motors
+                motor_state = data['motor_state'][:NUM_MOTORS]
+                m = self.motors
+                position, velocity, torque = m['position'], m['velocity'], m['torque']
+                temperature, lost = m['temperature'], m['lost']
+                for i, motor in enumerate(motor_state):
+                    position[i] = motor.get('q', 0)
+                    velocity[i] = motor.get('dq', 0)
+                    torque[i] = motor.get('tau_est', 0)
+                    temperature[i] = motor.get('temperature', 0)
+                    lost[i] = motor.get('lost', False)
+                changes['motor_count'] = len(motor_state)
             
             # Update battery data
-            if 'bms_state' in data:
-                bms = data['bms_state']
-                self.latest_data['battery'].update({
-                    'level': bms.get('soc', 0),
-                    'voltage': bms.get('voltage', 0) / 1000.0,  # Convert mV to V
-                    'current': bms.get('current', 0),
-                    'temperature': bms.get('mcu_ntc', 0)
-                })
+            if 'bms_state' in data or 'power_v' in data:
+                battery = dict(snapshot.battery)
+                if 'bms_state' in data:
+                    bms = data['bms_state']
+                    battery['level'] = bms.get('soc', 0)
+                    battery['voltage'] = bms.get('voltage', 0) / 1000.0  # Convert mV to V
+                    battery['current'] = bms.get('current', 0)
+                    battery['temperature'] = bms.get('mcu_ntc', 0)
+                # Update power voltage
+                if 'power_v' in data:
+                    battery['voltage'] = data['power_v']
+                changes['battery'] = battery
             
             # Update foot force
             if 'foot_force' in data:
-                self.latest_data['foot_force'] = data['foot_force']
+                _fill(self._foot_force, data['foot_force'])
             
-            # Update power voltage
-            if 'power_v' in data:
-                self.latest_data['battery']['voltage'] = data['power_v']
+            self.snapshot = snapshot._replace(ts=time.monotonic(), **changes)
                 
             # Trigger callbacks
             self._trigger_callbacks()
@@ -163,28 +229,31 @@ class UnitreeWebRTCClient:
         """Handle sport mode state data (position, velocity, mode)"""
         try:
             data = message['data']
+            changes = {}
             
             # Update position
             if 'position' in data and len(data['position']) >= 3:
                 pos = data['position']
-                self.latest_data['position'] = {
+                changes['position'] = {
                     'x': pos[0], 'y': pos[1], 'z': pos[2]
                 }
             
             # Update velocity
             if 'velocity' in data and len(data['velocity']) >= 3:
                 vel = data['velocity']
-                self.latest_data['velocity'] = {
+                changes['velocity'] = {
                     'x': vel[0], 'y': vel[1], 'z': vel[2]
                 }
             
-            # Update mode and other sport mode data
-            self.latest_data['mode'] = data.get('mode', 0)
-            self.latest_data['body_height'] = data.get('body_height', 0)
-            
-            # Update gait information
-            self.latest_data['gait_type'] = data.get('gait_type', 0)
-            self.latest_data['foot_raise_height'] = data.get('foot_raise_height', 0)
+            # Update mode, other sport mode data and gait information
+            self.snapshot = self.snapshot._replace(
+                mode=data.get('mode', 0),
+                body_height=data.get('body_height', 0),
+                gait_type=data.get('gait_type', 0),
+                foot_raise_height=data.get('foot_raise_height', 0),
+                ts=time.monotonic(),
+                **changes
+            )
             
             # Trigger callbacks
             self._trigger_callbacks()
@@ -199,27 +268,39 @@ class UnitreeWebRTCClient:
             # Handle any additional state data here
             # This topic provides various robot states and can be extended
             
+            self.snapshot = self.snapshot._replace(ts=time.monotonic())
             self._trigger_callbacks()
             
         except Exception as e:
             self.logger.error(f"Error handling multiple state data: {e}")
     
     def _trigger_callbacks(self):
-        """Trigger all registered data callbacks"""
-        for callback in self.data_callbacks:
-            try:
-                callback(self.latest_data.copy())
-            except Exception as e:
-                self.logger.error(f"Error in data callback: {e}")
+        """Wake the dispatcher; the SDK delivers messages on the event loop, so no thread hop is needed"""
+        self._data_ready.set()
+    
+    async def _dispatch_callbacks(self):
+        """Deliver the newest snapshot to all data callbacks (latest wins; bursts collapse into one call)"""
+        data_ready = self._data_ready
+        while True:
+            await data_ready.wait()
+            data_ready.clear()
+            snapshot = self.snapshot
+            for callback in self.data_callbacks:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    self.logger.error(f"Error in data callback: {e}")
     
     def add_data_callback(self, callback: Callable):
         """Add a callback function for data updates"""
-        self.data_callbacks.append(callback)
+        self._callbacks[callback] = None
+        self.data_callbacks = tuple(self._callbacks)
     
     def remove_data_callback(self, callback: Callable):
         """Remove a callback function"""
-        if callback in self.data_callbacks:
-            self.data_callbacks.remove(callback)
+        if callback in self._callbacks:
+            del self._callbacks[callback]
+            self.data_callbacks = tuple(self._callbacks)
     
     async def send_sport_command(self, command: str, **kwargs):
         """Send sport mode command to robot"""
@@ -255,12 +336,22 @@ class UnitreeWebRTCClient:
     
     async def move_robot(self, x: float, y: float, yaw: float):
         """Move robot with linear and angular velocities"""
-        return await self.send_sport_command(
-            'Move', 
-            vx=x, 
-            vy=y, 
-            vyaw=yaw
-        )
+        # Sent on every teleop tick: same message as send_sport_command('Move', ...), built directly
+        # without the command-name lookup and per-command info log
+        if not self.connection:
+            self.logger.error("Not connected to robot")
+            return False
+        
+        try:
+            self.connection.datachannel.pub_sub.publish(
+                self._sport_topic,
+                {"api_id": self._move_cmd_id, "vx": x, "vy": y, "vyaw": yaw}
+            )
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error sending sport command Move: {e}")
+            return False
     
     async def stand_up(self):
         """Make robot stand up"""
@@ -274,17 +365,25 @@ class UnitreeWebRTCClient:
         """Stop robot movement"""
         return await self.send_sport_command('StopMove')
     
-    def get_sensor_data(self) -> Dict[str, Any]:
-        """Get latest sensor data"""
-        return self.latest_data.copy()
+    def get_sensor_data(self) -> SensorSnapshot:
+        """Get latest sensor data (immutable and shared; use ._asdict() for a dict)"""
+        return self.snapshot
+    
+    def get_motor_buffer(self) -> memoryview:
+        """Read-only view of the motor table; np.frombuffer(view, MOTOR_STATE_DTYPE) reads it without copying"""
+        return memoryview(self._motor_table).toreadonly()
     
     def is_connected(self) -> bool:
         """Check if connected to robot"""
-        return self.latest_data.get('connected', False)
+        return self.snapshot.connected
     
     async def disconnect(self):
         """Disconnect from robot"""
         try:
+            if self._dispatch_task:
+                self._dispatch_task.cancel()
+                self._dispatch_task = None
+            
             if self.connection:
                 # Clean up subscriptions
                 if hasattr(self.connection, 'datachannel') and self.connection.datachannel:
@@ -308,7 +407,7 @@ class UnitreeWebRTCClient:
                 
                 self.connection = None
             
-            self.latest_data['connected'] = False
+            self.snapshot = self.snapshot._replace(connected=False)
             self.logger.info("Disconnected from Unitree robot")
             
         except Exception as e:
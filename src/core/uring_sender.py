@@ -0,0 +1,82 @@
+"""
+io_uring send backend for the UDP command path (Linux, optional)
+
+Packets handed over in a batch are queued as one submission per batch
+instead of one sendto() syscall per packet. Requires the `liburing`
+package and a 6.x kernel; callers fall back to the asyncio transport
+otherwise.
+"""
+
+import logging
+import os
+import queue
+import threading
+from typing import List
+
+try:
+    import liburing
+except ImportError:  # liburing is optional
+    liburing = None
+
+# Submission queue depth; larger batches are split across submissions
+_URING_ENTRIES = 64
+
+
+def uring_available() -> bool:
+    """Return True if liburing is installed and the kernel is new enough"""
+    if liburing is None:
+        return False
+    try:
+        return int(os.uname().release.split('.')[0]) >= 6
+    except (AttributeError, ValueError):
+        return False
+
+
+class UringSender:
+    """Sends datagrams on an already-connected socket from a dedicated io_uring thread"""
+
+    def __init__(self, fd: int, logger: logging.Logger):
+        self.fd = fd
+        self.logger = logger
+        self.ring = liburing.Ring()
+        self.cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(_URING_ENTRIES, self.ring)
+
+        self._batches = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="uring-sender", daemon=True)
+        self._thread.start()
+
+    def send_batch(self, packets: List[bytes]):
+        """Queue packets for the sender thread; the list must not be mutated afterwards"""
+        self._batches.put(packets)
+
+    def close(self):
+        """Stop the sender thread after it drains pending batches"""
+        self._batches.put(None)
+        self._thread.join()
+        liburing.io_uring_queue_exit(self.ring)
+
+    def _run(self):
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                return
+            for start in range(0, len(batch), _URING_ENTRIES):
+                self._submit(batch[start:start + _URING_ENTRIES])
+
+    def _submit(self, packets: List[bytes]):
+        """Submit one send per packet in a single syscall and reap the completions"""
+        for packet in packets:
+            sqe = liburing.io_uring_get_sqe(self.ring)
+            liburing.io_uring_prep_send(sqe, self.fd, packet)
+        liburing.io_uring_submit(self.ring)
+
+        for _ in packets:
+            liburing.io_uring_wait_cqe(self.ring, self.cqe)
+            entry = self.cqe[0]
+            try:
+                entry.res  # raises OSError if the send failed
+            except OSError as e:
+                self.logger.error(f"io_uring send failed: {e}")
+            finally:
+                liburing.io_uring_cqe_seen(self.ring, entry)
@@ -24,6 +24,11 @@ except ImportError:
 
 from utils.logger import get_logger
 
+# Binary message layout: u32 type, u32 length, then little-endian float32 payload
+_HEADER_STRUCT = struct.Struct('<II')
+_BATTERY_STRUCT = struct.Struct('<ff')
+_ODOM_STRUCT = struct.Struct('<ffffff')
+_TEMPERATURE_STRUCT = struct.Struct('<f')
 
 @dataclass
 class WebRTCConfig:
@@ -180,13 +185,11 @@ class WebRTCClient:
                 return {}
             
             # Example: first 4 bytes = message type, next 4 bytes = data length
-            msg_type = struct.unpack('<I', message[:4])[0]
-            data_len = struct.unpack('<I', message[4:8])[0]
+            msg_type, data_len = _HEADER_STRUCT.unpack_from(message)
             
             if msg_type == 1:  # Battery data
                 if len(message) >= 16:
-                    voltage = struct.unpack('<f', message[8:12])[0]
-                    percentage = struct.unpack('<f', message[12:16])[0]
+                    voltage, percentage = _BATTERY_STRUCT.unpack_from(message, 8)
                     return {
                         'type': 'battery_state',
                         'voltage': voltage,
@@ -195,12 +198,7 @@ class WebRTCClient:
                     }
             elif msg_type == 2:  # Odometry data
                 if len(message) >= 32:
-                    x = struct.unpack('<f', message[8:12])[0]
-                    y = struct.unpack('<f', message[12:16])[0]
-                    z = struct.unpack('<f', message[16:20])[0]
-                    roll = struct.unpack('<f', message[20:24])[0]
-                    pitch = struct.unpack('<f', message[24:28])[0]
-                    yaw = struct.unpack('<f', message[28:32])[0]
+                    x, y, z, roll, pitch, yaw = _ODOM_STRUCT.unpack_from(message, 8)
                     return {
                         'type': 'odometry',
                         'position': [x, y, z],
@@ -209,7 +207,7 @@ class WebRTCClient:
                     }
             elif msg_type == 3:  # Temperature data
                 if len(message) >= 12:
-                    temp = struct.unpack('<f', message[8:12])[0]
+                    temp, = _TEMPERATURE_STRUCT.unpack_from(message, 8)
                     return {
                         'type': 'temperature',
                         'temperature': temp,
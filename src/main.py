@@ -8,6 +8,11 @@ import signal
 import sys
 from pathlib import Path
 
+try:
+    import uvloop  # faster libuv-based event loop, used when installed
+except ImportError:  # uvloop is optional
+    uvloop = None
+
 from core.robot_manager import RobotManager
 from web.api_server import APIServer
 from utils.config_loader import ConfigLoader
@@ -137,4 +142,9 @@ if __name__ == "__main__":
     Path("logs").mkdir(exist_ok=True)
     
     # Run the application
-    asyncio.run(main())
+    if uvloop is not None and hasattr(uvloop, 'run'):
+        uvloop.run(main())
+    else:
+        if uvloop is not None:
+            uvloop.install()  # uvloop < 0.18 has no run()
+        asyncio.run(main())
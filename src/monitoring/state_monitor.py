@@ -219,7 +219,7 @@ class StateMonitor:
                 position=state.position,
                 orientation=state.orientation,
                 velocity=state.velocity,
-                joint_positions=state.joint_positions.copy() if state.joint_positions else [],
+                joint_positions=state.joint_positions.tolist(),
                 is_connected=state.is_connected
             )
             
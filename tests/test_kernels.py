@@ -0,0 +1,65 @@
+"""
+Numeric kernels: the compiled (Numba) and fallback backends must agree
+"""
+
+import math
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from core import _kernels  # noqa: E402
+
+LOWER = np.full(3, -1.0, dtype=np.float32)
+UPPER = np.full(3, 1.0, dtype=np.float32)
+
+BACKENDS = [_kernels._joints_within_limits_loop, _kernels._joints_within_limits_numpy]
+if _kernels.njit is not None:
+    BACKENDS.append(_kernels.joints_within_limits)  # compiled loop
+
+
+@pytest.mark.parametrize('check', BACKENDS)
+@pytest.mark.parametrize('joints, expected', [
+    ([0.0, 0.5, -0.5], True),
+    ([-1.0, 1.0, 0.0], True),
+    ([0.0, 1.5, 0.0], False),
+    ([0.0, math.nan, 0.0], False),
+])
+def test_joints_within_limits(check, joints, expected):
+    assert check(np.array(joints, dtype=np.float32), LOWER, UPPER) is expected
+
+
+QUAT_BACKENDS = [_kernels._quat_to_rpy]
+if _kernels.njit is not None:
+    QUAT_BACKENDS.append(_kernels.quat_to_rpy)  # compiled with fastmath
+
+H = math.sqrt(0.5)
+
+
+@pytest.mark.parametrize('convert', QUAT_BACKENDS)
+@pytest.mark.parametrize('quat, expected', [
+    ((0.0, 0.0, 0.0, 1.0), (0.0, 0.0, 0.0)),
+    ((H, 0.0, 0.0, H), (math.pi / 2, 0.0, 0.0)),
+    ((0.0, 0.0, H, H), (0.0, 0.0, math.pi / 2)),
+    ((0.0, 0.0, -H, H), (0.0, 0.0, -math.pi / 2)),
+    ((0.0, 0.0, 1.0, 0.0), (0.0, 0.0, math.pi)),
+    ((0.1, 0.2, 0.3, 0.927), (0.32714080, 0.31603460, 0.67819215)),
+])
+def test_quat_to_rpy(convert, quat, expected):
+    assert convert(*quat) == pytest.approx(expected, abs=1e-6)
+
+
+@pytest.mark.parametrize('convert', QUAT_BACKENDS)
+@pytest.mark.parametrize('y, pitch', [(H, math.pi / 2), (-H, -math.pi / 2), (0.7072, math.pi / 2), (-0.7072, -math.pi / 2)])
+def test_quat_to_rpy_gimbal_lock(convert, y, pitch):
+    # |sinp| >= 1 (including slightly non-unit input) takes the copysign branch instead of asin;
+    # roll and yaw are not unique there, only the pitch is checked
+    roll, result, yaw = convert(0.0, y, 0.0, abs(y))
+    assert result == pitch
+    assert math.isfinite(roll) and math.isfinite(yaw)
+
+
+@pytest.mark.parametrize('convert', QUAT_BACKENDS)
+def test_quat_to_rpy_nan_propagates(convert):
+    # A faulted odometry reading must not come out as a plausible orientation
+    assert all(math.isnan(angle) for angle in convert(math.nan, 0.0, 0.0, 1.0))
@@ -0,0 +1,121 @@
+"""
+RobotManager tests that run without a robot: protocol clients are replaced by recorders
+"""
+
+import math
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('go2_webrtc_driver')
+
+from core.robot_manager import MotionCommand, RobotManager  # noqa: E402
+
+
+class RecordingROS2Client:
+    def __init__(self):
+        self.stops = 0
+
+    def publish_stop(self):
+        self.stops += 1
+
+
+class RecordingWebRTCClient:
+    def __init__(self):
+        self.stops = 0
+
+    async def stop_movement(self):
+        self.stops += 1
+        return True
+
+
+def make_manager(protocol: str) -> RobotManager:
+    return RobotManager({
+        'robot': {'ip_address': '127.0.0.1'},
+        'communication': {'protocol': protocol},
+        'safety': {'boundaries': {}},
+    })
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('protocol', ['ros2', 'webrtc'])
+async def test_emergency_stop_sends_stop(protocol):
+    manager = make_manager(protocol)
+    client = RecordingROS2Client() if protocol == 'ros2' else RecordingWebRTCClient()
+    if protocol == 'ros2':
+        manager.ros2_client = client
+    else:
+        manager.webrtc_client = client
+    manager.is_connected = True
+
+    await manager.emergency_stop_robot()
+
+    assert manager.emergency_stop
+    assert client.stops == 1
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr=None):
+        self.sent.append(bytes(data))
+
+
+@pytest.mark.asyncio
+async def test_emergency_stop_sends_stop_packet_udp():
+    manager = make_manager('udp')
+    manager.transport = RecordingTransport()
+    manager._sendto = manager.transport.sendto
+    manager.is_connected = True
+    # No writer task is running and the queue is full: the stop must still go out, and
+    # nothing queued before it may be sent afterwards
+    while not manager._tx_queue.full():
+        manager._tx_queue.put_nowait(b'motion')
+
+    await manager.emergency_stop_robot()
+
+    assert manager.emergency_stop
+    assert manager.transport.sent == [manager._stop_packet]
+    assert manager._tx_queue.empty()
+
+
+def test_joint_limits_skipped_without_joint_data(caplog):
+    manager = make_manager('ros2')
+    manager.robot_state.is_connected = True
+    manager.robot_state.last_update = 1.0  # e.g. a battery reading; joints are still all zero
+
+    manager._check_safety_conditions()
+
+    assert "Joint positions outside configured limits" not in caplog.text
+
+
+@pytest.mark.parametrize('command', [
+    MotionCommand(0.5, step_height=math.nan),
+    MotionCommand(0.5, step_height=4.0),
+    MotionCommand(0.5, step_height=-0.1),
+    MotionCommand(math.nan),
+])
+def test_validation_rejects_unencodable_commands(command):
+    assert not make_manager('udp')._validate_motion_command(command)
+
+
+def test_speed_limits_capped_to_packet_range():
+    manager = RobotManager({'robot': {'max_speed': 5.0, 'max_angular_speed': 4.0}, 'safety': {'boundaries': {}}})
+    fastest = MotionCommand(manager._max_linear, -manager._max_linear, manager._max_angular)
+
+    assert manager._validate_motion_command(fastest)
+    manager._create_motion_packet(fastest)  # must not raise struct.error
+
+
+@pytest.mark.asyncio
+async def test_update_robot_state_with_fresh_webrtc_data():
+    manager = make_manager('webrtc')
+    manager.webrtc_client = RecordingWebRTCClient()
+    manager.robot_state.last_update = time.time()
+    manager.robot_state.orientation = (0.1, 0.2, 0.3)
+
+    await manager._update_robot_state()  # raised NameError on an undefined name
+
+    assert manager.robot_state.orientation == (0.1, 0.2, 0.3)